@@ -1,9 +1,22 @@
 import discord
+from discord import app_commands
 from discord.ext import commands
 import asyncio
 import os
-from config import TOKEN, PREFIX, OWNER_ID
-from database.db import Database
+import time
+from config import (
+    TOKEN, PREFIX, OWNER_ID, TICKET_NUMBER_BLOCK,
+    LOOP_WATCHDOG_INTERVAL, LOOP_STALL_THRESHOLD, LOOP_LAG_WINDOW, LOOP_STALL_HISTORY,
+    SHARD_COUNT, SHARD_IDS, CLUSTER_ID, CLUSTER_COUNT,
+    CLUSTER_IPC_HOST, CLUSTER_IPC_PORT, CLUSTER_STATS_INTERVAL
+)
+from database import AsyncDatabase, get_database
+from utils.counter import TicketCounter
+from utils.prefixes import PrefixCache
+from utils.blacklist import Blacklist, Blacklisted
+from utils.stats import BotStats
+from utils.watchdog import LoopWatchdog
+from utils.cluster import ClusterClient
 
 # ANSI Color codes
 class Colors:
@@ -22,16 +35,61 @@ intents.message_content = True
 intents.members = True
 intents.guilds = True
 
-class LazyXTicketBot(commands.Bot):
+class TicketCommandTree(app_commands.CommandTree):
+    async def interaction_check(self, interaction: discord.Interaction):
+        return await self.client.blacklist.check_interaction(interaction)
+
+async def get_prefix(bot, message):
+    return await bot.prefixes.get(message.guild.id if message.guild else None)
+
+class LazyXTicketBot(commands.AutoShardedBot):
     def __init__(self):
         super().__init__(
-            command_prefix=PREFIX,
+            command_prefix=get_prefix,
             intents=intents,
-            help_command=None
+            help_command=None,
+            tree_cls=TicketCommandTree,
+            shard_count=SHARD_COUNT,
+            shard_ids=SHARD_IDS
         )
-        self.db = Database()
+        self.db = AsyncDatabase(get_database())
+        self.ticket_counter = TicketCounter(self.db, TICKET_NUMBER_BLOCK)
+        self.prefixes = PrefixCache(self.db, PREFIX)
+        self.blacklist = Blacklist(self.db)
+        self.stats = BotStats()
+        self.watchdog = LoopWatchdog(LOOP_WATCHDOG_INTERVAL, LOOP_STALL_THRESHOLD, LOOP_LAG_WINDOW, LOOP_STALL_HISTORY)
+        # Only set when launcher.py runs the bot as several processes
+        self.cluster = None
+        if CLUSTER_COUNT > 1:
+            self.cluster = ClusterClient(self, CLUSTER_ID, CLUSTER_IPC_HOST, CLUSTER_IPC_PORT, CLUSTER_STATS_INTERVAL)
+        self.add_check(self.blacklist.check_command)
+    
+    def add_command(self, command):
+        super().add_command(command)
+        self.stats.commands_changed()
+    
+    def remove_command(self, name):
+        command = super().remove_command(name)
+        self.stats.commands_changed()
+        return command
+    
+    def owns_guild(self, guild_id):
+        """Whether this process runs the shard for a guild; other clusters handle the rest"""
+        if self.shard_ids is None:
+            return True
+        return (guild_id >> 22) % self.shard_count in self.shard_ids
     
     async def setup_hook(self):
+        self.watchdog.start()
+        if self.cluster:
+            self.cluster.start()
+        await self.blacklist.load()
+        
+        open_tickets = await self.db.get_open_tickets()
+        self.stats.open_tickets = sum(
+            len(tickets) for guild_id, tickets in open_tickets.items() if self.owns_guild(int(guild_id))
+        )
+        
         cogs_to_load = [
             'cogs.help',
             'cogs.onmention',
@@ -43,10 +101,12 @@ class LazyXTicketBot(commands.Bot):
             'cogs.threadticket',
             'cogs.channelticket',
             'cogs.ticketcontrols',
+            'cogs.closequeue',
             'cogs.slashcommands',
             'cogs.transcript',
             'cogs.reviews',
-            'cogs.ownerlogging'
+            'cogs.ownerlogging',
+            'cogs.metrics'
         ]
         
         print(f"{Colors.CYAN}{'='*60}{Colors.RESET}")
@@ -64,6 +124,10 @@ class LazyXTicketBot(commands.Bot):
         
         await self.setup_persistent_views()
         
+        # Slash commands are global, so one cluster syncing them is enough
+        if CLUSTER_ID != 0:
+            return
+        
         try:
             synced = await self.tree.sync()
             print(f'{Colors.GREEN}✓{Colors.RESET} Synced {Colors.YELLOW}{len(synced)}{Colors.RESET} slash commands')
@@ -71,31 +135,26 @@ class LazyXTicketBot(commands.Bot):
             print(f'{Colors.RED}✗{Colors.RESET} Failed to sync commands: {Colors.RED}{e}{Colors.RESET}')
     
     async def setup_persistent_views(self):
-        from utils.views import TicketDropdownView, TicketButtonView
-        from cogs.ticketcontrols import TicketControlView
-        
-        # Setup ticket panel views
-        for guild_id, guild_data in self.db._load_json(self.db.guilds_file).items():
-            if 'categories' in guild_data and 'style' in guild_data:
-                if guild_data['style'] == 'dropdown':
-                    view = TicketDropdownView(self, guild_data['categories'])
-                else:
-                    view = TicketButtonView(self, guild_data['categories'])
-                self.add_view(view)
-        
-        # Setup ticket control views for active tickets
-        tickets_data = self.db._load_json(self.db.tickets_file)
-        ticket_count = 0
-        
-        for guild_id, tickets in tickets_data.items():
-            for ticket_id, ticket_info in tickets.items():
-                if not ticket_info.get('closed', False):
-                    control_view = TicketControlView(self, int(ticket_id))
-                    self.add_view(control_view)
-                    ticket_count += 1
-        
-        print(f'{Colors.GREEN}✓{Colors.RESET} Setup persistent views')
-        print(f'{Colors.GREEN}✓{Colors.RESET} Loaded {Colors.YELLOW}{ticket_count}{Colors.RESET} ticket control views')
+        from utils.views import TicketCategorySelect, TicketCategoryButton
+        from cogs.ticketcontrols import TicketControlButton, LegacyTicketControlView
+        
+        start = time.perf_counter()
+        
+        # Panels and ticket controls resolve their guild/ticket from the
+        # custom_id when clicked, so this is the same few registrations
+        # however many panels and open tickets exist
+        self.add_dynamic_items(TicketCategorySelect, TicketCategoryButton, TicketControlButton)
+        self.add_view(LegacyTicketControlView(self))
+        
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f'{Colors.GREEN}✓{Colors.RESET} Setup persistent views in {Colors.YELLOW}{elapsed:.1f}ms{Colors.RESET}')
+    
+    async def close(self):
+        await super().close()
+        await self.watchdog.close()
+        if self.cluster:
+            await self.cluster.close()
+        await self.db.close()
     
     async def on_ready(self):
         # ASCII Art
@@ -118,12 +177,13 @@ class LazyXTicketBot(commands.Bot):
         print(f"   {Colors.CYAN}├─{Colors.RESET} Name: {Colors.YELLOW}{self.user.name}#{self.user.discriminator}{Colors.RESET}")
         print(f"   {Colors.CYAN}├─{Colors.RESET} ID: {Colors.YELLOW}{self.user.id}{Colors.RESET}")
         print(f"   {Colors.CYAN}├─{Colors.RESET} Prefix: {Colors.YELLOW}{PREFIX}{Colors.RESET}")
+        print(f"   {Colors.CYAN}├─{Colors.RESET} Shards: {Colors.YELLOW}{len(self.shards)} of {self.shard_count}{Colors.RESET} (cluster {CLUSTER_ID})")
         print(f"   {Colors.CYAN}└─{Colors.RESET} Owner ID: {Colors.YELLOW}{OWNER_ID}{Colors.RESET}")
         
         # Statistics
-        total_members = sum(g.member_count for g in self.guilds)
+        total_members = self.stats.totals['members']
         print(f"{Colors.BOLD}{Colors.GREEN}📊 Statistics:{Colors.RESET}")
-        print(f"   {Colors.CYAN}├─{Colors.RESET} Servers: {Colors.YELLOW}{len(self.guilds):,}{Colors.RESET}")
+        print(f"   {Colors.CYAN}├─{Colors.RESET} Servers: {Colors.YELLOW}{self.stats.guilds:,}{Colors.RESET}")
         print(f"   {Colors.CYAN}├─{Colors.RESET} Users: {Colors.YELLOW}{total_members:,}{Colors.RESET}")
         print(f"   {Colors.CYAN}└─{Colors.RESET} Latency: {Colors.YELLOW}{round(self.latency * 1000)}ms{Colors.RESET}")
         
@@ -138,9 +198,13 @@ class LazyXTicketBot(commands.Bot):
             name="Vintage | Support Team"
         )
         await self.change_presence(activity=activity, status=discord.Status.online)
+        
+        if self.cluster:
+            # The launcher starts the next cluster once this one has identified
+            await self.cluster.send('ready')
     
     async def on_command_error(self, ctx, error):
-        if isinstance(error, commands.CommandNotFound):
+        if isinstance(error, (commands.CommandNotFound, Blacklisted)):
             return
         
         if isinstance(error, commands.MissingPermissions):
@@ -0,0 +1,6 @@
+"""Offline benchmarks for the ticket lifecycle.
+
+`fakes` simulates the parts of Discord the ticket cogs talk to, with REST
+latency and rate limits; `lifecycle` drives the real cogs and database
+against it. Run with `python -m benchmarks.lifecycle --help`.
+"""
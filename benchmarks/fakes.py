@@ -0,0 +1,236 @@
+import discord
+import asyncio
+import contextvars
+import itertools
+import random
+import time
+from collections import Counter, defaultdict
+
+# Lifecycle stage the current task is in; REST calls are counted under it.
+# Work the close queue does on its own workers is counted as "background".
+stage = contextvars.ContextVar('stage', default='background')
+
+_ids = itertools.count(1_000_000_000_000_000_000)
+
+def next_id():
+    return next(_ids)
+
+class FakeRest:
+    """Stands in for Discord's HTTP API: every call sleeps for a latency and
+    respects a per-route rate limit, the way discord.py waits out a 429.
+    
+    `limits` maps a route to (requests, per seconds), applied separately
+    to each `bucket` (a channel or guild id); routes not listed are
+    unlimited.
+    """
+    
+    def __init__(self, latency, jitter, limits):
+        self.latency = latency
+        self.jitter = jitter
+        self.limits = limits
+        self.calls = defaultdict(Counter)
+        self.rate_limited = Counter()
+        # (route, bucket) -> times of the calls inside the current window
+        self._windows = defaultdict(list)
+    
+    async def request(self, route, bucket=None):
+        self.calls[stage.get()][route] += 1
+        
+        if route in self.limits:
+            requests, per = self.limits[route]
+            window = self._windows[route, bucket]
+            while True:
+                now = time.monotonic()
+                while window and window[0] <= now - per:
+                    window.pop(0)
+                if len(window) < requests:
+                    window.append(now)
+                    break
+                self.rate_limited[route] += 1
+                await asyncio.sleep(window[0] + per - now)
+        
+        await asyncio.sleep(max(0, random.gauss(self.latency, self.jitter)))
+
+class FakeAsset:
+    url = "https://cdn.discordapp.com/embed/avatars/0.png"
+
+class FakeRole:
+    def __init__(self, guild, name):
+        self.id = next_id()
+        self.guild = guild
+        self.name = name
+        self.mention = f"<@&{self.id}>"
+
+class FakeMember:
+    def __init__(self, guild, name, roles=(), administrator=False, bot=False):
+        self.id = next_id()
+        self.guild = guild
+        self.name = name
+        self.display_name = name
+        self.mention = f"<@{self.id}>"
+        self.display_avatar = FakeAsset()
+        self.roles = list(roles)
+        self.bot = bot
+        self.guild_permissions = discord.Permissions(administrator=administrator)
+    
+    def __str__(self):
+        return self.name
+
+class FakeMessage:
+    def __init__(self, channel, author, content=None, embed=None, embeds=None):
+        self.id = next_id()
+        self.channel = channel
+        self.author = author
+        self.content = content or ""
+        self.embeds = embeds or ([embed] if embed else [])
+        self.attachments = []
+        self.created_at = discord.utils.utcnow()
+        self.edited_at = None
+    
+    async def edit(self, **kwargs):
+        await self.channel.guild.rest.request('message_edit')
+    
+    async def delete(self):
+        await self.channel.guild.rest.request('message_delete')
+
+class FakeChannel:
+    """A text channel, category or private thread"""
+    
+    def __init__(self, guild, name, category=None):
+        self.id = next_id()
+        self.guild = guild
+        self.name = name
+        self.category = category
+        self.mention = f"<#{self.id}>"
+        self.deleted = asyncio.Event()
+        self.messages = []
+        guild.channels[self.id] = self
+    
+    async def send(self, content=None, embed=None, embeds=None, view=None, file=None, author=None):
+        await self.guild.rest.request('message_send', self.id)
+        message = FakeMessage(self, author or self.guild.me, content, embed, embeds)
+        self.messages.append(message)
+        self.guild.dispatch_message(message)
+        return message
+    
+    async def history(self, limit=None, after=None, oldest_first=True):
+        messages = [message for message in self.messages if after is None or message.id > after.id]
+        # One request per page of 100
+        for start in range(0, max(len(messages), 1), 100):
+            await self.guild.rest.request('message_history', self.id)
+            for message in messages[start:start + 100]:
+                yield message
+    
+    async def edit(self, **kwargs):
+        await self.guild.rest.request('channel_edit', self.id)
+        self.name = kwargs.get('name', self.name)
+    
+    async def delete(self, reason=None):
+        await self.guild.rest.request('channel_delete')
+        self.guild.channels.pop(self.id, None)
+        self.deleted.set()
+    
+    async def create_text_channel(self, name, overwrites=None, reason=None):
+        await self.guild.rest.request('channel_create', self.guild.id)
+        return FakeChannel(self.guild, name, category=self)
+    
+    async def create_thread(self, name, type=None, reason=None):
+        await self.guild.rest.request('channel_create', self.guild.id)
+        return FakeChannel(self.guild, name, category=self)
+    
+    async def add_user(self, user):
+        await self.guild.rest.request('thread_member_add')
+
+class FakeGuild:
+    def __init__(self, rest, members, filesize_limit=25 * 1024 * 1024):
+        self.id = next_id()
+        self.name = "Benchmark Guild"
+        self.icon = None
+        self.rest = rest
+        self.filesize_limit = filesize_limit
+        self.channels = {}
+        self.categories = []
+        self.message_listeners = []
+        
+        self.default_role = FakeRole(self, "@everyone")
+        self.staff_role = FakeRole(self, "Staff")
+        self.roles = [self.default_role, self.staff_role]
+        
+        self.me = FakeMember(self, "Ticket Bot", bot=True)
+        self.staff = FakeMember(self, "Staff Member", roles=[self.staff_role], administrator=True)
+        self.users = [FakeMember(self, f"user{i}") for i in range(members)]
+        self.members = [self.me, self.staff] + self.users
+        self.chunked = True
+        self._members = {member.id: member for member in self.members}
+        
+        self.panel_channel = FakeChannel(self, "tickets")
+        self.logs_channel = FakeChannel(self, "ticket-logs")
+    
+    def get_channel(self, channel_id):
+        return self.channels.get(channel_id)
+    
+    get_channel_or_thread = get_channel
+    
+    def get_role(self, role_id):
+        return next((role for role in self.roles if role.id == role_id), None)
+    
+    def get_member(self, member_id):
+        return self._members.get(member_id)
+    
+    async def create_category(self, name):
+        await self.rest.request('channel_create', self.id)
+        category = FakeChannel(self, name)
+        self.categories.append(category)
+        return category
+    
+    def dispatch_message(self, message):
+        for listener in self.message_listeners:
+            asyncio.get_running_loop().create_task(listener(message))
+
+class FakeResponse:
+    def __init__(self, interaction):
+        self.interaction = interaction
+        self._done = False
+        self.view = None
+    
+    def is_done(self):
+        return self._done
+    
+    async def _respond(self, route, view=None):
+        if self._done:
+            raise discord.InteractionResponded(self.interaction)
+        self._done = True
+        self.view = view
+        await self.interaction.guild.rest.request(route)
+    
+    async def defer(self, ephemeral=False, thinking=False):
+        await self._respond('interaction_response')
+    
+    async def send_message(self, content=None, embed=None, view=None, ephemeral=False):
+        await self._respond('interaction_response', view)
+    
+    async def edit_message(self, content=None, embed=None, view=None):
+        await self._respond('interaction_response', view)
+    
+    async def send_modal(self, modal):
+        await self._respond('interaction_response', modal)
+
+class FakeFollowup:
+    def __init__(self, interaction):
+        self.interaction = interaction
+    
+    async def send(self, content=None, embed=None, view=None, ephemeral=False, wait=False):
+        await self.interaction.guild.rest.request('followup_send')
+        return FakeMessage(self.interaction.channel, self.interaction.guild.me, content, embed)
+
+class FakeInteraction:
+    def __init__(self, client, guild, user, channel):
+        self.id = next_id()
+        self.client = client
+        self.guild = guild
+        self.user = user
+        self.channel = channel
+        self.created_at = discord.utils.utcnow()
+        self.data = {}
+        self.response = FakeResponse(self)
+        self.followup = FakeFollowup(self)
@@ -0,0 +1,225 @@
+"""Drive concurrent create -> claim -> priority -> close cycles through the
+real ticket cogs and database against a simulated Discord.
+    
+    python -m benchmarks.lifecycle --tickets 200 --concurrency 50 --backend sqlite
+"""
+import discord
+from discord.ext import commands
+import argparse
+import asyncio
+import contextvars
+import os
+import tempfile
+import time
+from collections import defaultdict
+from benchmarks.fakes import FakeRest, FakeGuild, FakeInteraction, stage
+from config import PREFIX, TICKET_NUMBER_BLOCK
+
+STAGES = ('create', 'claim', 'priority', 'close')
+
+class BenchBot(commands.Bot):
+    """Just enough of LazyXTicketBot for the ticket cogs, serving one fake guild"""
+    
+    def __init__(self, db, guild):
+        super().__init__(command_prefix=PREFIX, intents=discord.Intents.none(), help_command=None)
+        from utils.counter import TicketCounter
+        from utils.blacklist import Blacklist
+        from utils.stats import BotStats
+        self.db = db
+        self.ticket_counter = TicketCounter(db, TICKET_NUMBER_BLOCK)
+        self.blacklist = Blacklist(db)
+        self.stats = BotStats()
+        self.guild = guild
+    
+    @property
+    def user(self):
+        return self.guild.me
+    
+    def get_guild(self, guild_id):
+        return self.guild if guild_id == self.guild.id else None
+    
+    def owns_guild(self, guild_id):
+        return True
+    
+    async def wait_until_ready(self):
+        return
+
+def percentile(samples, q):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(q * len(samples)))] if samples else 0.0
+
+def open_database(backend, workdir):
+    from database import AsyncDatabase, Database, ShardedDatabase, SQLiteDatabase
+    if backend == "sqlite":
+        return AsyncDatabase(SQLiteDatabase(os.path.join(workdir, "tickets.db")))
+    if backend == "sharded":
+        return AsyncDatabase(ShardedDatabase())
+    return AsyncDatabase(Database())
+
+async def setup_bot(args):
+    from cogs.ticketcreation import TicketCreation
+    from cogs.threadticket import ThreadTicket
+    from cogs.channelticket import ChannelTicket
+    from cogs.closequeue import CloseQueue
+    from cogs.transcript import Transcript
+    from utils.admission import AdmissionController
+    
+    rest = FakeRest(args.latency, args.jitter, {
+        'channel_create': (args.channel_create_limit, 10),
+        'channel_edit': (2, 600),
+        'message_send': (5, 5)
+    })
+    guild = FakeGuild(rest, args.tickets)
+    db = open_database(args.backend, os.getcwd())
+    bot = BenchBot(db, guild)
+    
+    for cog in (TicketCreation, ThreadTicket, ChannelTicket, Transcript):
+        await bot.add_cog(cog(bot))
+    # The delay before a closed ticket's channel is deleted is for humans
+    await bot.add_cog(CloseQueue(bot, delay=args.close_delay))
+    
+    threads = bot.get_cog('ThreadTicket')
+    start_onboarding = threads.start_onboarding
+    
+    def start_onboarding_in_background(*args):
+        # Staff are added after the opener has their reply, so don't count it under "create"
+        context = contextvars.copy_context()
+        context.run(stage.set, 'background')
+        context.run(start_onboarding, *args)
+    
+    threads.start_onboarding = start_onboarding_in_background
+    
+    creation = bot.get_cog('TicketCreation')
+    creation.admission = AdmissionController(args.create_rate, args.create_burst, args.tickets, 5)
+    guild.message_listeners.append(bot.get_cog('Transcript').on_message)
+    
+    await db.set_guild_panel(guild.id, {
+        'categories': [{'name': "Support", 'staff_roles': [guild.staff_role.id], 'staff_role_id': guild.staff_role.id}],
+        'panel_data': {},
+        'thread_ticket': args.mode == "thread"
+    })
+    await db.set_ticket_logs_channel(guild.id, guild.logs_channel.id)
+    return bot, guild
+
+async def ticket_cycle(bot, guild, user, args, timings):
+    from cogs.ticketcontrols import TicketControlButton
+    
+    def interaction(member, channel):
+        return FakeInteraction(bot, guild, member, channel)
+    
+    async def timed(name, coro):
+        stage.set(name)
+        start = time.perf_counter()
+        result = await coro
+        timings[name].append(time.perf_counter() - start)
+        return result
+    
+    creation = bot.get_cog('TicketCreation')
+    ticket_data = {
+        'user_id': user.id,
+        'category': "Support",
+        'category_data': {'name': "Support", 'staff_roles': [guild.staff_role.id]},
+        'subject': f"Benchmark ticket for {user}",
+        'description': "Created by benchmarks.lifecycle",
+        'priority': "medium"
+    }
+    await timed('create', creation.handle_ticket_creation(interaction(user, guild.panel_channel), ticket_data))
+    
+    channel_id = await bot.db.get_open_ticket_for_user(guild.id, user.id)
+    channel = guild.get_channel(channel_id) if channel_id else None
+    if channel is None:
+        timings['failed'].append(0)
+        return
+    
+    stage.set('conversation')
+    for i in range(args.messages):
+        await channel.send(content=f"Message {i}", author=user if i % 2 else guild.staff)
+    
+    async def claim():
+        await TicketControlButton(bot, 'claim', channel_id).claim_ticket(interaction(guild.staff, channel))
+    
+    async def change_priority():
+        prompt = interaction(guild.staff, channel)
+        await TicketControlButton(bot, 'priority', channel_id).change_priority(prompt)
+        select = prompt.response.view.children[0]
+        select._values = ['high']
+        await select.callback(interaction(guild.staff, channel))
+    
+    async def close():
+        prompt = interaction(guild.staff, channel)
+        await TicketControlButton(bot, 'close', channel_id).close_ticket(prompt)
+        await prompt.response.view.confirm_close.callback(interaction(guild.staff, channel))
+        # Closed once the queue has deleted the channel
+        await channel.deleted.wait()
+    
+    await timed('claim', claim())
+    await timed('priority', change_priority())
+    await timed('close', close())
+
+def report(args, rest, timings, elapsed):
+    print(f"{args.tickets} tickets, concurrency {args.concurrency}, {args.mode} tickets, {args.backend} backend, "
+          f"{args.latency * 1000:.0f}ms REST latency")
+    print(f"Completed {len(timings['close'])} cycles in {elapsed:.2f}s "
+          f"({len(timings['close']) / elapsed:.1f} tickets/s), {len(timings['failed'])} failed\n")
+    
+    print(f"{'stage':<14}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}   REST calls")
+    for name in STAGES + ('conversation', 'background'):
+        samples = timings.get(name, [])
+        calls = ", ".join(f"{route}={count}" for route, count in sorted(rest.calls[name].items()))
+        if not samples and not calls:
+            continue
+        latencies = "".join(f"{percentile(samples, q) * 1000:>10.1f}" if samples else f"{'-':>10}" for q in (0.50, 0.95, 0.99))
+        print(f"{name:<14}{len(samples):>7}{latencies}   {calls}")
+    
+    if rest.rate_limited:
+        print("\nRate limited: " + ", ".join(f"{route}={count}" for route, count in sorted(rest.rate_limited.items())))
+
+async def run(args):
+    bot, guild = await setup_bot(args)
+    timings = defaultdict(list)
+    semaphore = asyncio.Semaphore(args.concurrency)
+    
+    async def limited(user):
+        async with semaphore:
+            try:
+                await ticket_cycle(bot, guild, user, args, timings)
+            except Exception as e:
+                print(f"Error in ticket cycle for {user}: {e}")
+                timings['failed'].append(0)
+    
+    start = time.perf_counter()
+    await asyncio.gather(*(limited(user) for user in guild.users))
+    elapsed = time.perf_counter() - start
+    
+    report(args, guild.rest, timings, elapsed)
+    
+    for cog in list(bot.cogs):
+        await bot.remove_cog(cog)
+    await bot.db.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the ticket lifecycle against a simulated Discord")
+    parser.add_argument("--tickets", type=int, default=50, help="tickets to create, one user each")
+    parser.add_argument("--concurrency", type=int, default=25, help="ticket cycles running at once")
+    parser.add_argument("--mode", choices=("thread", "channel"), default="thread")
+    parser.add_argument("--backend", choices=("json", "sharded", "sqlite"), default="json")
+    parser.add_argument("--messages", type=int, default=10, help="messages posted in each ticket before it is claimed")
+    parser.add_argument("--latency", type=float, default=0.05, help="mean REST latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.01, help="standard deviation of REST latency")
+    parser.add_argument("--channel-create-limit", type=int, default=50, help="channel/thread creations allowed per 10s")
+    parser.add_argument("--create-rate", type=float, default=20, help="admission rate for ticket creation, per second")
+    parser.add_argument("--create-burst", type=int, default=5)
+    parser.add_argument("--close-delay", type=float, default=0, help="seconds between closing and deleting a ticket")
+    args = parser.parse_args()
+    
+    # The JSON backends and transcript logs write under ./data
+    with tempfile.TemporaryDirectory(prefix="ticket-bench-") as workdir:
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            asyncio.run(run(args))
+        finally:
+            os.chdir(cwd)
+
+if __name__ == '__main__':
+    main()
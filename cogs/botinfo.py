@@ -12,6 +12,51 @@ class BotInfo(commands.Cog):
         self.start_time = time.time()
         self.process = psutil.Process()
     
+    # Keep bot.stats current
+    @commands.Cog.listener()
+    async def on_guild_available(self, guild):
+        self.bot.stats.add_guild(guild)
+    
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild):
+        self.bot.stats.add_guild(guild)
+    
+    @commands.Cog.listener()
+    async def on_guild_unavailable(self, guild):
+        self.bot.stats.remove_guild(guild.id)
+    
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild):
+        self.bot.stats.remove_guild(guild.id)
+    
+    @commands.Cog.listener()
+    async def on_member_join(self, member):
+        self.bot.stats.adjust(member.guild.id, 'members', 1)
+    
+    @commands.Cog.listener()
+    async def on_raw_member_remove(self, payload):
+        self.bot.stats.adjust(payload.guild_id, 'members', -1)
+    
+    @commands.Cog.listener()
+    async def on_guild_channel_create(self, channel):
+        self.bot.stats.channel_changed(channel, 1)
+    
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel):
+        self.bot.stats.channel_changed(channel, -1)
+    
+    @commands.Cog.listener()
+    async def on_guild_role_create(self, role):
+        self.bot.stats.adjust(role.guild.id, 'roles', 1)
+    
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role):
+        self.bot.stats.adjust(role.guild.id, 'roles', -1)
+    
+    @commands.Cog.listener()
+    async def on_guild_emojis_update(self, guild, before, after):
+        self.bot.stats.set(guild.id, 'emojis', len(after))
+    
     def get_uptime_string(self):
         """Get formatted uptime string"""
         uptime_seconds = int(time.time() - self.start_time)
@@ -76,7 +121,7 @@ class BotInfo(commands.Cog):
         
         await ctx.send(embed=embed)
     
- 
+    
     @commands.hybrid_command(name="uptime", description="View bot uptime")
     async def uptime(self, ctx: commands.Context):
         """Display bot uptime and statistics"""
@@ -112,7 +157,7 @@ class BotInfo(commands.Cog):
         except:
             pass
         
-        total_commands = len([cmd for cmd in self.bot.walk_commands()])
+        total_commands = self.bot.stats.command_count(self.bot)
         embed.add_field(
             name=f"⚙️ Commands",
             value=f"**{total_commands}**",
@@ -129,8 +174,9 @@ class BotInfo(commands.Cog):
     async def botinfo(self, ctx: commands.Context):
         """Comprehensive bot information with detailed stats"""
         
-        total_members = sum(g.member_count for g in self.bot.guilds)
-        total_channels = sum(len(g.channels) for g in self.bot.guilds)
+        stats = self.bot.stats.merged()
+        total_members = stats['members']
+        total_channels = stats['channels']
         
         embed = discord.Embed(
             title=f"{EMOJIS['info']} {self.bot.user.name} Information",
@@ -150,10 +196,11 @@ class BotInfo(commands.Cog):
         
         embed.add_field(
             name=f"{EMOJIS['trophy']} Statistics",
-            value=f"**Servers:** {len(self.bot.guilds):,}\n"
+            value=f"**Servers:** {stats['guilds']:,}\n"
                   f"**Users:** {total_members:,}\n"
                   f"**Channels:** {total_channels:,}\n"
-                  f"**Commands:** {len([cmd for cmd in self.bot.walk_commands()])}\n",
+                  f"**Open Tickets:** {stats['open_tickets']:,}\n"
+                  f"**Commands:** {self.bot.stats.command_count(self.bot)}\n",
             inline=True
         )
         
@@ -196,11 +243,13 @@ class BotInfo(commands.Cog):
     async def stats(self, ctx: commands.Context):
         """Detailed bot statistics and metrics"""
         
-        total_members = sum(g.member_count for g in self.bot.guilds)
-        total_text = sum(len(g.text_channels) for g in self.bot.guilds)
-        total_voice = sum(len(g.voice_channels) for g in self.bot.guilds)
-        total_roles = sum(len(g.roles) for g in self.bot.guilds)
-        total_emojis = sum(len(g.emojis) for g in self.bot.guilds)
+        stats = self.bot.stats.merged()
+        total_guilds = stats['guilds']
+        total_members = stats['members']
+        total_text = stats['text_channels']
+        total_voice = stats['voice_channels']
+        total_roles = stats['roles']
+        total_emojis = stats['emojis']
         
         embed = discord.Embed(
             title=f"{EMOJIS['trophy']} Bot Statistics",
@@ -211,9 +260,9 @@ class BotInfo(commands.Cog):
         
         embed.add_field(
             name="🏠 Servers",
-            value=f"**Total:** {len(self.bot.guilds):,}\n"
+            value=f"**Total:** {total_guilds:,}\n"
                   f"**Members:** {total_members:,}\n"
-                  f"**Average:** {total_members // len(self.bot.guilds) if self.bot.guilds else 0:,}/server",
+                  f"**Average:** {total_members // total_guilds if total_guilds else 0:,}/server",
             inline=True
         )
         
@@ -229,15 +278,25 @@ class BotInfo(commands.Cog):
             name="✨ Others",
             value=f"**Roles:** {total_roles:,}\n"
                   f"**Emojis:** {total_emojis:,}\n"
-                  f"**Commands:** {len([cmd for cmd in self.bot.walk_commands()])}\n",
+                  f"**Open Tickets:** {stats['open_tickets']:,}\n"
+                  f"**Commands:** {self.bot.stats.command_count(self.bot)}\n",
             inline=True
         )
         
+        performance = (
+            f"**Latency:** {round(self.bot.latency * 1000)}ms\n"
+            f"**Shards:** {self.bot.shard_count}\n"
+            f"**Uptime:** {self.get_uptime_string()}\n"
+        )
+        
+        creation_cog = self.bot.get_cog('TicketCreation')
+        percentiles = creation_cog.creation_percentiles() if creation_cog else None
+        if percentiles:
+            performance += f"**Ticket Creation:** p50 {percentiles[0]:.0f}ms / p95 {percentiles[1]:.0f}ms\n"
+        
         embed.add_field(
             name=f"{EMOJIS['time']} Performance",
-            value=f"**Latency:** {round(self.bot.latency * 1000)}ms\n"
-                  f"**Uptime:** {self.get_uptime_string()}\n"
-                  f"**Status:** {EMOJIS['success']} Stable\n",
+            value=performance + f"**Status:** {EMOJIS['success']} Stable\n",
             inline=False
         )
         
@@ -1,12 +1,8 @@
 import discord
 from discord.ext import commands
-from utils.embeds import (
-    create_ticket_embed,
-    create_success_embed, 
-    create_error_embed, 
-    create_log_embed
-)
-from config import PRIORITY_EMOJIS, COLORS, EMOJIS
+from utils.embeds import create_error_embed
+from utils.metrics import TICKET_ERRORS
+from config import PRIORITY_EMOJIS
 
 class ChannelTicket(commands.Cog):
     def __init__(self, bot):
@@ -64,43 +60,16 @@ class ChannelTicket(commands.Cog):
             
             mention_text = " ".join(mentions)
             
-            # MESSAGE 1: Ticket Embed with Image
-            ticket_embed = create_ticket_embed(interaction.user, ticket_data)
-            await ticket_channel.send(content=mention_text, embed=ticket_embed)
-            
-            # MESSAGE 2: Control Buttons (NO EMBED)
-            from cogs.ticketcontrols import TicketControlView
-            control_view = TicketControlView(self.bot, ticket_channel.id)
-            await ticket_channel.send(view=control_view)
-            
-            ticket_data['channel_id'] = ticket_channel.id
-            self.bot.db.create_ticket(interaction.guild.id, ticket_channel.id, ticket_data)
-            
-            logs_channel_id = self.bot.db.get_ticket_logs_channel(interaction.guild.id)
-            if logs_channel_id:
-                logs_channel = interaction.guild.get_channel(logs_channel_id)
-                if logs_channel:
-                    log_embed = create_log_embed(
-                        f"{EMOJIS['ticket']} Ticket Created",
-                        {
-                            f"{EMOJIS['user']} User": interaction.user.mention,
-                            f"{EMOJIS['category']} Category": ticket_data['category'],
-                            f"{EMOJIS['pencil']} Subject": ticket_data['subject'],
-                            f"{EMOJIS['priority']} Priority": f"{priority_emoji} {priority.title()}",
-                            f"{EMOJIS['ticket']} Channel": ticket_channel.mention
-                        },
-                        COLORS['green']
-                    )
-                    await logs_channel.send(embed=log_embed)
-            
-            success_embed = create_success_embed(
-                f"Ticket created: {ticket_channel.mention}",
-                interaction.user
-            )
-            await interaction.followup.send(embed=success_embed, ephemeral=True)
+            transcript_cog = self.bot.get_cog('Transcript')
+            if transcript_cog:
+                transcript_cog.start_capture(ticket_channel.id)
             
+            creation_cog = self.bot.get_cog('TicketCreation')
+            await creation_cog.finish_ticket(interaction, ticket_channel, ticket_data, mention_text, "Channel")
+        
         except Exception as e:
             print(f"Error: {e}")
+            TICKET_ERRORS.inc(stage='create')
             error_embed = create_error_embed(f"Failed to create ticket: {str(e)}", interaction.user)
             await interaction.followup.send(embed=error_embed, ephemeral=True)
 
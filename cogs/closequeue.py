@@ -0,0 +1,211 @@
+import discord
+from discord.ext import commands
+import asyncio
+from collections import deque
+from datetime import datetime, timedelta
+from utils.embeds import create_log_embed
+from utils.metrics import TICKET_STAGE_SECONDS, TICKET_ERRORS
+from config import PRIORITY_EMOJIS, EMOJIS, CLOSE_WORKERS, CLOSE_MAX_ATTEMPTS, CLOSE_DELAY, CLOSE_RETRY_DELAY
+
+class CloseQueue(commands.Cog):
+    """Closes tickets in the background.
+    
+    A close request is stored on the ticket itself (its 'closing' field),
+    so jobs that were queued or half done when the bot stopped are picked
+    up again on the next start. A small pool of workers takes jobs from
+    each guild in turn, so one guild closing many tickets at once can't
+    hold up the others. A close that keeps failing is queued again after
+    a longer wait.
+    """
+    
+    def __init__(self, bot, delay=CLOSE_DELAY):
+        self.bot = bot
+        # Seconds between a close request and deleting the channel
+        self.delay = delay
+        # guild_id -> channel ids waiting to close, and the guilds in turn order
+        self._jobs = {}
+        self._guild_order = deque()
+        self._pending = asyncio.Semaphore(0)
+        # Channels queued or being worked on, so a ticket is never closed twice
+        self._active = set()
+        self._tasks = []
+        self._retries = set()
+    
+    @property
+    def pending(self):
+        return len(self._active)
+    
+    async def cog_load(self):
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(CLOSE_WORKERS)]
+        self._tasks.append(asyncio.create_task(self._resume()))
+    
+    async def cog_unload(self):
+        for task in self._tasks + list(self._retries):
+            task.cancel()
+    
+    async def enqueue(self, guild_id, channel_id, closed_by):
+        """Persist a close request and queue it; returns False if already closing"""
+        if channel_id in self._active:
+            return False
+        # Claimed before the write so a second request can't slip in during it
+        self._active.add(channel_id)
+        
+        closing = {
+            'closed_by': closed_by,
+            'delete_at': (datetime.utcnow() + timedelta(seconds=self.delay)).isoformat(),
+            'done': []
+        }
+        try:
+            await self.bot.db.update_ticket(guild_id, channel_id, closing=closing)
+        except Exception:
+            self._active.discard(channel_id)
+            raise
+        
+        self._push(guild_id, channel_id)
+        return True
+    
+    def _push(self, guild_id, channel_id):
+        self._active.add(channel_id)
+        
+        if guild_id not in self._jobs:
+            self._jobs[guild_id] = deque()
+            self._guild_order.append(guild_id)
+        self._jobs[guild_id].append(channel_id)
+        
+        self._pending.release()
+    
+    def _pop(self):
+        guild_id = self._guild_order.popleft()
+        jobs = self._jobs[guild_id]
+        channel_id = jobs.popleft()
+        
+        # Send the guild to the back of the line if it has more to close
+        if jobs:
+            self._guild_order.append(guild_id)
+        else:
+            del self._jobs[guild_id]
+        
+        return guild_id, channel_id
+    
+    async def _resume(self):
+        await self.bot.wait_until_ready()
+        
+        resumed = 0
+        open_tickets = await self.bot.db.get_open_tickets()
+        for guild_id, tickets in open_tickets.items():
+            # Another cluster closes the tickets of guilds on its shards
+            if not self.bot.owns_guild(int(guild_id)):
+                continue
+            for channel_id, ticket_data in tickets.items():
+                if ticket_data.get('closing') and int(channel_id) not in self._active:
+                    self._push(int(guild_id), int(channel_id))
+                    resumed += 1
+        
+        if resumed:
+            print(f"Resumed {resumed} ticket closes")
+    
+    async def _worker(self):
+        while True:
+            await self._pending.acquire()
+            guild_id, channel_id = self._pop()
+            
+            if await self._attempt_close(guild_id, channel_id):
+                self._active.discard(channel_id)
+            else:
+                # Still active, so nobody queues it again in the meantime
+                print(f"Giving up on closing ticket {channel_id} for now, retrying in {CLOSE_RETRY_DELAY}s")
+                task = asyncio.create_task(self._requeue(guild_id, channel_id))
+                self._retries.add(task)
+                task.add_done_callback(self._retries.discard)
+    
+    async def _attempt_close(self, guild_id, channel_id):
+        """Try to close a ticket CLOSE_MAX_ATTEMPTS times; returns False if every attempt failed"""
+        for attempt in range(1, CLOSE_MAX_ATTEMPTS + 1):
+            try:
+                await self.close_ticket(guild_id, channel_id)
+                return True
+            except Exception as e:
+                print(f"Error closing ticket {channel_id} (attempt {attempt}/{CLOSE_MAX_ATTEMPTS}): {e}")
+                TICKET_ERRORS.inc(stage='close')
+                if attempt < CLOSE_MAX_ATTEMPTS:
+                    await asyncio.sleep(2 ** attempt)
+        return False
+    
+    async def _requeue(self, guild_id, channel_id):
+        await asyncio.sleep(CLOSE_RETRY_DELAY)
+        self._push(guild_id, channel_id)
+    
+    async def _mark_done(self, guild_id, channel_id, closing, step):
+        closing['done'].append(step)
+        await self.bot.db.update_ticket(guild_id, channel_id, closing=closing)
+    
+    @TICKET_STAGE_SECONDS.time(stage='close')
+    async def close_ticket(self, guild_id, channel_id):
+        """Run the close steps that haven't completed yet; safe to call again after a failure"""
+        ticket_data = await self.bot.db.get_ticket(guild_id, channel_id)
+        if not ticket_data or not ticket_data.get('closing'):
+            return
+        
+        closing = ticket_data['closing']
+        closed_by = closing.get('closed_by')
+        guild = self.bot.get_guild(guild_id)
+        channel = guild.get_channel_or_thread(channel_id) if guild else None
+        
+        if channel:
+            if 'logged' not in closing['done']:
+                await self.post_close_log(guild, channel, ticket_data, closed_by)
+                await self._mark_done(guild_id, channel_id, closing, 'logged')
+            
+            if 'reviewed' not in closing['done']:
+                review_cog = self.bot.get_cog('Reviews')
+                user = guild.get_member(ticket_data.get('user_id'))
+                if review_cog and user:
+                    await review_cog.send_review_request(user, ticket_data, guild_id)
+                await self._mark_done(guild_id, channel_id, closing, 'reviewed')
+            
+            # Give the people in the ticket a moment to read the closing message
+            delay = (datetime.fromisoformat(closing['delete_at']) - datetime.utcnow()).total_seconds()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            
+            try:
+                await channel.delete()
+            except discord.NotFound:
+                pass
+        
+        await self.bot.db.delete_ticket(guild_id, channel_id, closed_by)
+        self.bot.stats.tickets_changed(-1)
+    
+    async def post_close_log(self, guild, channel, ticket_data, closed_by):
+        transcript_cog = self.bot.get_cog('Transcript')
+        logs_channel_id = await self.bot.db.get_ticket_logs_channel(guild.id)
+        logs_channel = guild.get_channel(logs_channel_id) if logs_channel_id else None
+        if not transcript_cog or not logs_channel:
+            return
+        
+        transcript_files, transcript_stats = await transcript_cog.create_transcript(channel, ticket_data)
+        
+        priority = ticket_data.get('priority', 'medium')
+        priority_emoji = PRIORITY_EMOJIS.get(priority, '🟡')
+        
+        log_embed = create_log_embed(
+            f"{EMOJIS['close']} Ticket Closed",
+            {
+                f"{EMOJIS['ticket']} Ticket": f"#{ticket_data.get('ticket_number', 0):04d}",
+                f"{EMOJIS['pencil']} Subject": ticket_data.get('subject', 'N/A'),
+                f"{EMOJIS['category']} Category": ticket_data.get('category', 'N/A'),
+                f"{EMOJIS['user']} Closed by": f"<@{closed_by}>",
+                f"{EMOJIS['priority']} Priority": f"{priority_emoji} {priority.title()}"
+            }
+        )
+        
+        await logs_channel.send(embed=log_embed, file=transcript_files[0])
+        # Parts of a transcript over the upload limit go one per message
+        for transcript_file in transcript_files[1:]:
+            await logs_channel.send(file=transcript_file)
+        
+        # Stored on the ticket so it is carried into the archive record
+        await self.bot.db.update_ticket(guild.id, channel.id, transcript=transcript_stats)
+
+async def setup(bot):
+    await bot.add_cog(CloseQueue(bot))
@@ -1,11 +1,14 @@
 import discord
 from discord.ext import commands
 import asyncio
+import io
 import sys
 import os
+import threading
 import traceback
 from datetime import datetime
-from config import COLORS, EMOJIS, OWNER_ID
+from utils.profiler import SamplingProfiler, MemoryTracer
+from config import COLORS, EMOJIS, OWNER_ID, PROFILE_INTERVAL
 
 def is_bot_owner():
     """Custom check for bot owner from config"""
@@ -17,6 +20,14 @@ class Developer(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.owner_id = OWNER_ID  # Store owner ID from config
+        self.profiler = None
+        self.memtracer = MemoryTracer()
+    
+    async def cog_unload(self):
+        if self.profiler:
+            self.profiler.stop()
+        if self.memtracer.running:
+            self.memtracer.stop()
     
     async def cog_check(self, ctx):
         """Global check for all commands in this cog"""
@@ -223,6 +234,7 @@ class Developer(commands.Cog):
         )
         
         await ctx.send(embed=embed)
+        await self.bot.db.close()
         os.execv(sys.executable, ['python'] + sys.argv)
     
     @commands.command(name="servers", description="List all servers")
@@ -277,16 +289,10 @@ class Developer(commands.Cog):
     
     @commands.command(name="blacklist", description="Blacklist a user")
     async def blacklist(self, ctx, user_id: int):
-        guilds = self.bot.db._load_json(self.bot.db.guilds_file)
-        
-        if 'blacklist' not in guilds:
-            guilds['blacklist'] = []
-        
-        if user_id in guilds['blacklist']:
+        if not await self.bot.blacklist.add(user_id):
             return await ctx.send(f"{EMOJIS['error']} User is already blacklisted!")
-        
-        guilds['blacklist'].append(user_id)
-        self.bot.db._save_json(self.bot.db.guilds_file, guilds)
+        if self.bot.cluster:
+            await self.bot.cluster.publish('blacklist')
         
         embed = discord.Embed(
             title=f"{EMOJIS['success']} User Blacklisted",
@@ -297,13 +303,10 @@ class Developer(commands.Cog):
     
     @commands.command(name="unblacklist", description="Remove user from blacklist")
     async def unblacklist(self, ctx, user_id: int):
-        guilds = self.bot.db._load_json(self.bot.db.guilds_file)
-        
-        if 'blacklist' not in guilds or user_id not in guilds['blacklist']:
+        if not await self.bot.blacklist.remove(user_id):
             return await ctx.send(f"{EMOJIS['error']} User is not blacklisted!")
-        
-        guilds['blacklist'].remove(user_id)
-        self.bot.db._save_json(self.bot.db.guilds_file, guilds)
+        if self.bot.cluster:
+            await self.bot.cluster.publish('blacklist')
         
         embed = discord.Embed(
             title=f"{EMOJIS['success']} User Unblacklisted",
@@ -409,6 +412,100 @@ class Developer(commands.Cog):
         embed.set_footer(text=f"Owner ID from config: {self.owner_id}")
         
         await ctx.send(embed=embed)
+    
+    def report_file(self, name, text):
+        stamp = datetime.utcnow().strftime('%Y%m%d-%H%M%S')
+        return discord.File(io.BytesIO(text.encode()), filename=f"{name}-{stamp}.txt")
+    
+    @commands.group(name="profile", description="Sample CPU profiles of the event loop", invoke_without_command=True)
+    async def profile(self, ctx):
+        state = "running" if self.profiler else "stopped"
+        await ctx.send(f"{EMOJIS['settings']} Profiler is {state}. Usage: `profile start [interval ms]`, `profile dump`, `profile stop`")
+    
+    @profile.command(name="start", description="Start sampling the event loop")
+    async def profile_start(self, ctx, interval: float = PROFILE_INTERVAL * 1000):
+        if self.profiler:
+            return await ctx.send(f"{EMOJIS['error']} Profiler is already running!")
+        
+        self.profiler = SamplingProfiler(max(interval, 1) / 1000)
+        # Commands run on the event loop's thread, which is the one to sample
+        self.profiler.start(threading.get_ident())
+        
+        embed = discord.Embed(
+            title=f"{EMOJIS['success']} Profiler Started",
+            description=f"Sampling the event loop every **{self.profiler.interval * 1000:g}ms**",
+            color=COLORS['dark'],
+            timestamp=datetime.utcnow()
+        )
+        await ctx.send(embed=embed)
+    
+    @profile.command(name="dump", description="Upload the profile so far and keep sampling")
+    async def profile_dump(self, ctx):
+        if not self.profiler:
+            return await ctx.send(f"{EMOJIS['error']} Profiler is not running!")
+        
+        await ctx.send(file=self.report_file("profile", self.profiler.dump()))
+    
+    @profile.command(name="stop", description="Stop sampling and upload the profile")
+    async def profile_stop(self, ctx):
+        if not self.profiler:
+            return await ctx.send(f"{EMOJIS['error']} Profiler is not running!")
+        
+        profiler, self.profiler = self.profiler, None
+        await asyncio.to_thread(profiler.stop)
+        await ctx.send(f"{EMOJIS['success']} Profiler stopped", file=self.report_file("profile", profiler.dump()))
+    
+    @commands.group(name="memtrace", description="Compare memory snapshots", invoke_without_command=True)
+    async def memtrace(self, ctx):
+        if not self.memtracer.running:
+            self.memtracer.start()
+            return await ctx.send(f"{EMOJIS['success']} Memory tracing started. Run `memtrace` again to see what grew.")
+        
+        msg = await ctx.send(f"{EMOJIS['time']} Taking snapshot...")
+        report = await asyncio.to_thread(self.memtracer.diff)
+        await msg.delete()
+        await ctx.send(file=self.report_file("memtrace", report))
+    
+    @memtrace.command(name="stop", description="Stop memory tracing")
+    async def memtrace_stop(self, ctx):
+        if not self.memtracer.running:
+            return await ctx.send(f"{EMOJIS['error']} Memory tracing is not running!")
+        
+        self.memtracer.stop()
+        await ctx.send(f"{EMOJIS['success']} Memory tracing stopped")
+    
+    @commands.command(name="stalls", description="Show event loop lag and the worst recent stalls")
+    async def stalls(self, ctx, count: int = 5):
+        watchdog = self.bot.watchdog
+        worst = watchdog.worst(max(1, min(count, 25)))
+        lag = " | ".join(f"**p{int(q * 100)}:** {watchdog.percentile(q) * 1000:.1f}ms" for q in (0.5, 0.95, 0.99))
+        
+        embed = discord.Embed(
+            title=f"{EMOJIS['clock']} Event Loop Lag",
+            description=f"{lag} | **max:** {max(watchdog.lags, default=0) * 1000:.1f}ms\n"
+                       f"Over the last {len(watchdog.lags) * watchdog.interval:.0f}s, "
+                       f"stalls are lags over {watchdog.threshold * 1000:.0f}ms",
+            color=COLORS['dark'],
+            timestamp=datetime.utcnow()
+        )
+        
+        report = []
+        for i, stall in enumerate(worst, 1):
+            context = " ".join(f"{key}=`{value}`" for key, value in stall['context'].items())
+            embed.add_field(
+                name=f"`{i}.` {stall['lag'] * 1000:.0f}ms in {stall['coro'] or 'unknown'}",
+                value=f"<t:{int(stall['time'])}:R> {context}".rstrip(),
+                inline=False
+            )
+            report.append(f"#{i} {stall['lag'] * 1000:.0f}ms at {datetime.utcfromtimestamp(stall['time'])} UTC, "
+                          f"task {stall['task']} ({stall['coro']}) {stall['context']}")
+            report.append(stall['stack'] or "No stack captured\n")
+        
+        if not worst:
+            embed.add_field(name="Stalls", value="None recorded", inline=False)
+            return await ctx.send(embed=embed)
+        
+        await ctx.send(embed=embed, file=self.report_file("stalls", "\n".join(report)))
 
 async def setup(bot):
     await bot.add_cog(Developer(bot))
\ No newline at end of file
@@ -11,6 +11,10 @@ class General(commands.Cog):
         self.bot = bot
         self.start_time = time.time()
 
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild):
+        self.bot.prefixes.forget(guild.id)
+
     # SERVER INFO
     @commands.hybrid_command(name="serverinfo", description="Get detailed server information")
     async def serverinfo(self, ctx: commands.Context):
@@ -111,14 +115,7 @@ class General(commands.Cog):
             else:
                 return await ctx.response.send_message(embed=error_embed, ephemeral=True)
 
-        guilds = self.bot.db._load_json(self.bot.db.guilds_file)
-        guild_id = str(ctx.guild.id)
-
-        if guild_id not in guilds:
-            guilds[guild_id] = {}
-
-        guilds[guild_id]['prefix'] = prefix
-        self.bot.db._save_json(self.bot.db.guilds_file, guilds)
+        await self.bot.prefixes.set(ctx.guild.id, prefix)
 
         embed = discord.Embed(
             title=f"{EMOJIS['success']} Prefix Updated",
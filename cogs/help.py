@@ -1,10 +1,11 @@
 import discord
 from discord.ext import commands
 from discord import ui
-from config import PREFIX, COLORS, EMOJIS
+from utils.blacklist import BlacklistCheck
+from config import COLORS, EMOJIS
 from datetime import datetime
 
-class HelpCategorySelect(ui.Select):
+class HelpCategorySelect(BlacklistCheck, ui.Select):
     def __init__(self, bot):
         self.bot = bot
         
@@ -39,12 +40,7 @@ class HelpCategorySelect(ui.Select):
         category = self.values[0]
         
         # Get prefix
-        prefix = PREFIX
-        try:
-            guilds = self.bot.db._load_json(self.bot.db.guilds_file)
-            prefix = guilds.get(str(interaction.guild.id), {}).get('prefix', PREFIX)
-        except:
-            pass
+        prefix = await self.bot.prefixes.get(interaction.guild.id if interaction.guild else None)
         
         if category == "commands":
             embed = self.create_commands_embed(prefix)
@@ -180,7 +176,7 @@ class HelpCategorySelect(ui.Select):
             value="Click on Submit Button to send the panel",
             inline=False
         )
-               
+        
         embed.add_field(
             name=f"{EMOJIS['success']} Done!",
             value="Your ticket system is now ready! Users can create tickets by clicking buttons.\n",
@@ -190,7 +186,7 @@ class HelpCategorySelect(ui.Select):
         embed.set_footer(text="Setup takes less than 5 minutes • Need help? Use /support")
         return embed
 
-class HelpView(ui.View):
+class HelpView(BlacklistCheck, ui.View):
     def __init__(self, bot):
         super().__init__(timeout=180)
         self.bot = bot
@@ -221,12 +217,7 @@ class Help(commands.Cog):
         """Interactive help menu"""
         
         # Get prefix
-        prefix = PREFIX
-        try:
-            guilds = self.bot.db._load_json(self.bot.db.guilds_file)
-            prefix = guilds.get(str(ctx.guild.id), {}).get('prefix', PREFIX)
-        except:
-            pass
+        prefix = await self.bot.prefixes.get(ctx.guild.id if ctx.guild else None)
         
         # Create main embed
         embed = discord.Embed(
@@ -0,0 +1,56 @@
+from discord.ext import commands
+from aiohttp import web
+from config import METRICS_HOST, METRICS_PORT, CLUSTER_ID
+from utils.metrics import registry, GUILDS, MEMBERS, CLOSE_QUEUE_PENDING, TICKET_QUEUE_LENGTH
+
+class Metrics(commands.Cog):
+    """Serves utils.metrics in the Prometheus text format at /metrics"""
+    
+    def __init__(self, bot):
+        self.bot = bot
+        self.runner = None
+    
+    async def cog_load(self):
+        GUILDS.set_function(lambda: self.bot.stats.guilds)
+        MEMBERS.set_function(lambda: self.bot.stats.totals['members'])
+        CLOSE_QUEUE_PENDING.set_function(self.close_queue_pending)
+        TICKET_QUEUE_LENGTH.set_function(self.ticket_queue_length)
+        
+        if METRICS_PORT is None:
+            return
+        
+        app = web.Application()
+        app.router.add_get('/metrics', self.handle_metrics)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        
+        port = METRICS_PORT + CLUSTER_ID
+        try:
+            await web.TCPSite(self.runner, METRICS_HOST, port).start()
+            print(f"Serving metrics on http://{METRICS_HOST}:{port}/metrics")
+        except OSError as e:
+            print(f"Error starting metrics server: {e}")
+            await self.runner.cleanup()
+            self.runner = None
+    
+    async def cog_unload(self):
+        if self.runner is not None:
+            await self.runner.cleanup()
+            self.runner = None
+    
+    def close_queue_pending(self):
+        close_queue = self.bot.get_cog('CloseQueue')
+        return close_queue.pending if close_queue else 0
+    
+    def ticket_queue_length(self):
+        creation_cog = self.bot.get_cog('TicketCreation')
+        return creation_cog.admission.queued if creation_cog else 0
+    
+    async def handle_metrics(self, request):
+        return web.Response(
+            body=registry.render().encode('utf-8'),
+            headers={'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+        )
+
+async def setup(bot):
+    await bot.add_cog(Metrics(bot))
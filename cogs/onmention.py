@@ -1,8 +1,9 @@
 import discord
 from discord.ext import commands
 from discord import ui
-from config import PREFIX, COLORS, EMOJIS
+from config import COLORS, EMOJIS, MENTION_COOLDOWN, MENTION_EMBED_TTL
 from datetime import datetime
+import time
 
 class OnMentionView(ui.View):
     def __init__(self, bot):
@@ -14,10 +15,39 @@ class OnMentionView(ui.View):
 class OnMention(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        # One reply per channel per MENTION_COOLDOWN seconds
+        self.cooldown = commands.CooldownMapping.from_cooldown(1, MENTION_COOLDOWN, commands.BucketType.channel)
+        # guild_id -> (prefix, expires, embed); the server count in it is refreshed every MENTION_EMBED_TTL
+        self.embeds = {}
+        self.view = None
+    
+    def get_embed(self, guild_id, prefix):
+        cached = self.embeds.get(guild_id)
+        if cached and cached[0] == prefix and cached[1] > time.monotonic():
+            return cached[2]
+        
+        embed = discord.Embed(
+            description=f"**{EMOJIS['sparkle']} Hey! I'm {self.bot.user.name}**\n"
+                       f"Your advanced ticket management bot serving **{len(self.bot.guilds):,}** servers!\n"
+                       f"**Quick Start:**\n"
+                       f"`{prefix}help` or `/ticketsetup` to begin!\n",
+            color=COLORS['dark']
+        )
+        
+        embed.set_thumbnail(url=self.bot.user.display_avatar.url)
+        embed.set_footer(text=f"Prefix: {prefix}")
+        
+        self.embeds[guild_id] = (prefix, time.monotonic() + MENTION_EMBED_TTL, embed)
+        return embed
+    
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild):
+        self.embeds.pop(guild.id, None)
     
     @commands.Cog.listener()
     async def on_message(self, message):
-        if message.author.bot:
+        # Most messages mention nobody; skip them before doing anything else
+        if not message.mentions or message.author.bot:
             return
         
         if (self.bot.user.mentioned_in(message) and
@@ -25,27 +55,19 @@ class OnMention(commands.Cog):
             not (message.reference and message.reference.resolved and
                  message.reference.resolved.author == self.bot.user)):
             
+            if self.cooldown.update_rate_limit(message):
+                return
+            
             try:
-                prefix = PREFIX
-                guilds = self.bot.db._load_json(self.bot.db.guilds_file)
-                guild_id = str(message.guild.id) if message.guild else None
-                if guild_id and guild_id in guilds and 'prefix' in guilds[guild_id]:
-                    prefix = guilds[guild_id]['prefix']
-                
-                embed = discord.Embed(
-                    description=f"**{EMOJIS['sparkle']} Hey! I'm {self.bot.user.name}**\n"
-                               f"Your advanced ticket management bot serving **{len(self.bot.guilds):,}** servers!\n"
-                               f"**Quick Start:**\n"
-                               f"`{prefix}help` or `/ticketsetup` to begin!\n",
-                    color=COLORS['dark']
-                )
-                
-                embed.set_thumbnail(url=self.bot.user.display_avatar.url)
-                embed.set_footer(text=f"Prefix: {prefix}")
-                
-                view = OnMentionView(self.bot)
-                await message.reply(embed=embed, view=view, mention_author=False)
+                guild_id = message.guild.id if message.guild else None
+                prefix = await self.bot.prefixes.get(guild_id)
+                embed = self.get_embed(guild_id, prefix)
                 
+                # Only link buttons, so one view can be sent with every reply
+                if self.view is None:
+                    self.view = OnMentionView(self.bot)
+                await message.reply(embed=embed, view=self.view, mention_author=False)
+            
             except Exception as e:
                 print(f"❌ Error: {e}")
 
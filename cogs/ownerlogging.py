@@ -1,25 +1,23 @@
 import discord
 from discord.ext import commands
-from config import OWNER_WEBHOOK_URL, COLORS, EMOJIS
+from config import OWNER_WEBHOOK_URL, OWNER_LOG_FLUSH_INTERVAL, OWNER_LOG_MAX_PENDING, COLORS, EMOJIS
 from datetime import datetime
-import aiohttp
+from utils.webhooklog import WebhookLogBuffer
 
 class OwnerLogging(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.webhook = None
         if OWNER_WEBHOOK_URL:
-            self.setup_webhook()
+            self.webhook = WebhookLogBuffer(OWNER_WEBHOOK_URL, OWNER_LOG_FLUSH_INTERVAL, OWNER_LOG_MAX_PENDING)
     
-    def setup_webhook(self):
-        async def create_session():
-            session = aiohttp.ClientSession()
-            self.webhook = discord.Webhook.from_url(
-                OWNER_WEBHOOK_URL,
-                session=session
-            )
-        
-        self.bot.loop.create_task(create_session())
+    async def cog_load(self):
+        if self.webhook:
+            self.webhook.start()
+    
+    async def cog_unload(self):
+        if self.webhook:
+            await self.webhook.close()
     
     @commands.Cog.listener()
     async def on_guild_join(self, guild):
@@ -65,10 +63,7 @@ class OwnerLogging(commands.Cog):
         
         embed.set_footer(text=f"Server Count: {total_servers}")
         
-        try:
-            await self.webhook.send(embed=embed)
-        except Exception as e:
-            print(f"Error sending guild join log: {e}")
+        self.webhook.put(embed)
     
     @commands.Cog.listener()
     async def on_guild_remove(self, guild):
@@ -105,10 +100,7 @@ class OwnerLogging(commands.Cog):
         
         embed.set_footer(text=f"Server Count: {total_servers}")
         
-        try:
-            await self.webhook.send(embed=embed)
-        except Exception as e:
-            print(f"Error sending guild remove log: {e}")
+        self.webhook.put(embed)
     
     @commands.Cog.listener()
     async def on_command(self, ctx):
@@ -140,10 +132,7 @@ class OwnerLogging(commands.Cog):
         
         embed.set_footer(text=f"User ID: {ctx.author.id}", icon_url=ctx.author.display_avatar.url)
         
-        try:
-            await self.webhook.send(embed=embed)
-        except Exception as e:
-            print(f"Error sending command log: {e}")
+        self.webhook.put(embed)
     
     @commands.Cog.listener()
     async def on_application_command(self, interaction: discord.Interaction):
@@ -180,10 +169,7 @@ class OwnerLogging(commands.Cog):
         
         embed.set_footer(text=f"User ID: {interaction.user.id}", icon_url=interaction.user.display_avatar.url)
         
-        try:
-            await self.webhook.send(embed=embed)
-        except Exception as e:
-            print(f"Error sending slash command log: {e}")
+        self.webhook.put(embed)
 
 async def setup(bot):
     await bot.add_cog(OwnerLogging(bot))
\ No newline at end of file
@@ -7,10 +7,11 @@ from utils.embeds import (
     create_review_post_embed,
     create_info_embed
 )
+from utils.blacklist import BlacklistCheck
 from config import COLORS, EMOJIS, RATING_EMOJIS, REVIEW_ENABLED
 from datetime import datetime
 
-class ReviewModal(ui.Modal, title="📊 Rate Your Support Experience"):
+class ReviewModal(BlacklistCheck, ui.Modal, title="📊 Rate Your Support Experience"):
     staff_member = ui.TextInput(
         label="Which staff member helped you most?",
         placeholder="Enter their username or type 'No one specific'",
@@ -90,7 +91,7 @@ class ReviewModal(ui.Modal, title="📊 Rate Your Support Experience"):
         review_embed = create_review_post_embed(review_data, interaction.user)
         await review_channel.send(embed=review_embed)
 
-class ReviewView(ui.View):
+class ReviewView(BlacklistCheck, ui.View):
     def __init__(self, bot, ticket_data, guild_id):
         super().__init__(timeout=None)
         self.bot = bot
@@ -129,7 +130,7 @@ class Reviews(commands.Cog):
             review_view = ReviewView(self.bot, ticket_data, guild_id)
             
             await user.send(embed=review_embed, view=review_view)
-            
+        
         except discord.Forbidden:
             print(f"Could not send review request to {user} - DMs disabled")
         except Exception as e:
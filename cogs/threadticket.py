@@ -1,16 +1,61 @@
 import discord
 from discord.ext import commands
-from utils.embeds import (
-    create_ticket_embed,
-    create_success_embed, 
-    create_error_embed, 
-    create_log_embed
-)
-from config import PRIORITY_EMOJIS, COLORS, EMOJIS
+import asyncio
+from utils.embeds import create_error_embed
+from utils.rolecache import RoleMemberCache
+from utils.metrics import TICKET_ERRORS
+from config import PRIORITY_EMOJIS, STAFF_ADD_CONCURRENCY
 
 class ThreadTicket(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.role_members = RoleMemberCache()
+        # Background staff onboarding tasks, kept so they aren't garbage collected
+        self._onboarding = set()
+    
+    @commands.Cog.listener()
+    async def on_member_join(self, member):
+        self.role_members.add_member(member)
+    
+    @commands.Cog.listener()
+    async def on_member_update(self, before, after):
+        if before.roles != after.roles:
+            self.role_members.update_member(before, after)
+    
+    @commands.Cog.listener()
+    async def on_raw_member_remove(self, payload):
+        self.role_members.remove_member(payload.guild_id, payload.user.id)
+    
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role):
+        self.role_members.remove_role(role.guild.id, role.id)
+    
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild):
+        self.role_members.drop_guild(guild.id)
+    
+    @commands.Cog.listener()
+    async def on_guild_available(self, guild):
+        # Members changed while the guild was unavailable went unseen
+        self.role_members.drop_guild(guild.id)
+    
+    async def add_staff(self, thread, member_ids):
+        """Add staff to a ticket thread, a few requests at a time"""
+        semaphore = asyncio.Semaphore(STAFF_ADD_CONCURRENCY)
+        
+        async def add(member_id):
+            async with semaphore:
+                try:
+                    await thread.add_user(discord.Object(id=member_id))
+                except Exception as e:
+                    print(f"Error adding {member_id} to {thread.id}: {e}")
+        
+        await asyncio.gather(*(add(member_id) for member_id in member_ids))
+    
+    def start_onboarding(self, thread, member_ids):
+        task = asyncio.create_task(self.add_staff(thread, member_ids))
+        self._onboarding.add(task)
+        task.add_done_callback(self._onboarding.discard)
     
     async def create_thread_ticket(self, interaction: discord.Interaction, ticket_data: dict):
         ticket_num = ticket_data['ticket_number']
@@ -28,15 +73,6 @@ class ThreadTicket(commands.Cog):
             
             await thread.add_user(interaction.user)
             
-            for role_id in ticket_data['category_data'].get('staff_roles', []):
-                role = interaction.guild.get_role(role_id)
-                if role:
-                    for member in role.members:
-                        try:
-                            await thread.add_user(member)
-                        except:
-                            pass
-            
             mentions = [interaction.user.mention]
             for role_id in ticket_data['category_data'].get('staff_roles', []):
                 role = interaction.guild.get_role(role_id)
@@ -45,43 +81,21 @@ class ThreadTicket(commands.Cog):
             
             mention_text = " ".join(mentions)
             
-            # MESSAGE 1: Ticket Embed with Image
-            ticket_embed = create_ticket_embed(interaction.user, ticket_data)
-            await thread.send(content=mention_text, embed=ticket_embed)
-            
-            # MESSAGE 2: Control Buttons (NO EMBED)
-            from cogs.ticketcontrols import TicketControlView
-            control_view = TicketControlView(self.bot, thread.id)
-            await thread.send(view=control_view)
+            transcript_cog = self.bot.get_cog('Transcript')
+            if transcript_cog:
+                transcript_cog.start_capture(thread.id)
             
-            ticket_data['channel_id'] = thread.id
-            self.bot.db.create_ticket(interaction.guild.id, thread.id, ticket_data)
-            
-            logs_channel_id = self.bot.db.get_ticket_logs_channel(interaction.guild.id)
-            if logs_channel_id:
-                logs_channel = interaction.guild.get_channel(logs_channel_id)
-                if logs_channel:
-                    log_embed = create_log_embed(
-                        f"{EMOJIS['ticket']} Ticket Created",
-                        {
-                            f"{EMOJIS['user']} User": interaction.user.mention,
-                            f"{EMOJIS['category']} Category": ticket_data['category'],
-                            f"{EMOJIS['pencil']} Subject": ticket_data['subject'],
-                            f"{EMOJIS['priority']} Priority": f"{priority_emoji} {priority.title()}",
-                            f"{EMOJIS['ticket']} Thread": thread.mention
-                        },
-                        COLORS['green']
-                    )
-                    await logs_channel.send(embed=log_embed)
-            
-            success_embed = create_success_embed(
-                f"Ticket created: {thread.mention}",
-                interaction.user
-            )
-            await interaction.followup.send(embed=success_embed, ephemeral=True)
+            creation_cog = self.bot.get_cog('TicketCreation')
+            await creation_cog.finish_ticket(interaction, thread, ticket_data, mention_text, "Thread")
             
+            # The opener can already see their ticket; bring staff in behind it
+            staff_ids = self.role_members.members(interaction.guild, ticket_data['category_data'].get('staff_roles', []))
+            staff_ids.discard(interaction.user.id)
+            self.start_onboarding(thread, staff_ids)
+        
         except Exception as e:
             print(f"Error: {e}")
+            TICKET_ERRORS.inc(stage='create')
             error_embed = create_error_embed(f"Failed to create ticket: {str(e)}", interaction.user)
             await interaction.followup.send(embed=error_embed, ephemeral=True)
 
@@ -3,20 +3,20 @@ from discord import ui
 from discord.ext import commands
 from utils.embeds import (
     create_closing_embed, create_claim_embed, 
-    create_priority_change_embed, create_error_embed,
-    create_log_embed
+    create_priority_change_embed, create_error_embed
 )
+from utils.metrics import TICKET_STAGE_SECONDS
+from utils.blacklist import BlacklistCheck
 from config import COLORS, PRIORITY_EMOJIS, PRIORITY_COLORS, EMOJIS
-import asyncio
 
-def has_staff_role(bot, guild, user, ticket_data):
+async def has_staff_role(bot, guild, user, ticket_data):
     """Check if user has staff role for this ticket category"""
     # Owner and Admins always have access
     if user.guild_permissions.administrator:
         return True
     
     # Get staff roles for this ticket's category
-    panel_data = bot.db.get_guild_panel(guild.id)
+    panel_data = await bot.db.get_guild_panel(guild.id)
     if not panel_data or 'categories' not in panel_data:
         return False
     
@@ -31,7 +31,7 @@ def has_staff_role(bot, guild, user, ticket_data):
     
     return False
 
-class PrioritySelect(ui.Select):
+class PrioritySelect(BlacklistCheck, ui.Select):
     def __init__(self, bot, ticket_id):
         self.bot = bot
         self.ticket_id = ticket_id
@@ -49,14 +49,15 @@ class PrioritySelect(ui.Select):
             custom_id=f"priority_select_{ticket_id}"
         )
     
+    @TICKET_STAGE_SECONDS.time(stage='priority')
     async def callback(self, interaction: discord.Interaction):
-        ticket_data = self.bot.db.get_ticket(interaction.guild.id, self.ticket_id)
+        ticket_data = await self.bot.db.get_ticket(interaction.guild.id, self.ticket_id)
         if not ticket_data:
             error_embed = create_error_embed("Ticket not found!", interaction.user)
             return await interaction.response.send_message(embed=error_embed, ephemeral=True)
         
         # Check staff permissions
-        if not has_staff_role(self.bot, interaction.guild, interaction.user, ticket_data):
+        if not await has_staff_role(self.bot, interaction.guild, interaction.user, ticket_data):
             error_embed = discord.Embed(
                 title=f"{EMOJIS['error']} Permission Denied",
                 description=f"{EMOJIS['warning']} **You don't have permission to change ticket priority!**\n"
@@ -72,7 +73,7 @@ class PrioritySelect(ui.Select):
         old_priority = ticket_data.get('priority', 'medium')
         priority_emoji = PRIORITY_EMOJIS.get(priority, '🟡')
         
-        self.bot.db.update_ticket(interaction.guild.id, self.ticket_id, priority=priority)
+        await self.bot.db.update_ticket(interaction.guild.id, self.ticket_id, priority=priority)
         
         channel = interaction.channel
         ticket_num = ticket_data.get('ticket_number', 0)
@@ -86,12 +87,12 @@ class PrioritySelect(ui.Select):
         priority_embed = create_priority_change_embed(old_priority, priority)
         await interaction.response.send_message(embed=priority_embed)
 
-class PriorityChangeView(ui.View):
+class PriorityChangeView(BlacklistCheck, ui.View):
     def __init__(self, bot, ticket_id):
         super().__init__(timeout=60)
         self.add_item(PrioritySelect(bot, ticket_id))
 
-class CloseConfirmView(ui.View):
+class CloseConfirmView(BlacklistCheck, ui.View):
     def __init__(self, bot, ticket_id):
         super().__init__(timeout=60)
         self.bot = bot
@@ -103,6 +104,16 @@ class CloseConfirmView(ui.View):
         self.value = True
         self.stop()
         
+        # Transcript, logs, review request and deletion happen in the background
+        close_queue = self.bot.get_cog('CloseQueue')
+        if not close_queue:
+            error_embed = create_error_embed("Closing tickets is unavailable right now!", interaction.user)
+            return await interaction.response.edit_message(embed=error_embed, view=None)
+        
+        if not await close_queue.enqueue(interaction.guild.id, self.ticket_id, interaction.user.id):
+            error_embed = create_error_embed("This ticket is already being closed!", interaction.user)
+            return await interaction.response.edit_message(embed=error_embed, view=None)
+        
         closing_embed = discord.Embed(
             title=f"{EMOJIS['close']} Closing Ticket",
             description=(
@@ -119,47 +130,6 @@ class CloseConfirmView(ui.View):
         closing_embed.set_footer(text="Vintage Support System", icon_url=interaction.guild.icon.url if interaction.guild.icon else None)
         
         await interaction.response.edit_message(embed=closing_embed, view=None)
-        
-        ticket_data = self.bot.db.get_ticket(interaction.guild.id, self.ticket_id)
-        if ticket_data:
-            user_id = ticket_data.get('user_id')
-            user = interaction.guild.get_member(user_id)
-            
-            transcript_cog = self.bot.get_cog('Transcript')
-            if transcript_cog:
-                transcript = await transcript_cog.create_transcript(interaction.channel, ticket_data)
-                
-                logs_channel_id = self.bot.db.get_ticket_logs_channel(interaction.guild.id)
-                if logs_channel_id:
-                    logs_channel = interaction.guild.get_channel(logs_channel_id)
-                    if logs_channel:
-                        priority = ticket_data.get('priority', 'medium')
-                        priority_emoji = PRIORITY_EMOJIS.get(priority, '🟡')
-                        
-                        log_embed = create_log_embed(
-                            f"{EMOJIS['close']} Ticket Closed",
-                            {
-                                f"{EMOJIS['ticket']} Ticket": f"#{ticket_data.get('ticket_number', 0):04d}",
-                                f"{EMOJIS['pencil']} Subject": ticket_data.get('subject', 'N/A'),
-                                f"{EMOJIS['category']} Category": ticket_data.get('category', 'N/A'),
-                                f"{EMOJIS['user']} Closed by": interaction.user.mention,
-                                f"{EMOJIS['priority']} Priority": f"{priority_emoji} {priority.title()}"
-                            }
-                        )
-                        
-                        await logs_channel.send(embed=log_embed, file=transcript)
-            
-            review_cog = self.bot.get_cog('Reviews')
-            if review_cog and user:
-                await review_cog.send_review_request(user, ticket_data, interaction.guild.id)
-        
-        await asyncio.sleep(5)
-        
-        try:
-            await interaction.channel.delete()
-            self.bot.db.delete_ticket(interaction.guild.id, self.ticket_id)
-        except Exception as e:
-            print(f"Error deleting ticket: {e}")
     
     @ui.button(label="No, Keep Open", style=discord.ButtonStyle.secondary, emoji="<:icons_cross:1424794344292094084>")
     async def cancel_close(self, interaction: discord.Interaction, button: ui.Button):
@@ -176,21 +146,45 @@ class CloseConfirmView(ui.View):
         
         await interaction.response.edit_message(embed=cancel_embed, view=None)
 
-class TicketControlView(ui.View):
-    def __init__(self, bot, ticket_id):
-        super().__init__(timeout=None)
+CONTROL_BUTTONS = {
+    'close': dict(label="Close Ticket", style=discord.ButtonStyle.red, emoji="<:icons_cross:1424794344292094084>", row=0),
+    'claim': dict(label="Claim Ticket", style=discord.ButtonStyle.green, emoji="<:bye:1424995824999596042>", row=0),
+    'priority': dict(label="Change Priority", style=discord.ButtonStyle.blurple, emoji="<a:lighting_icons:1424969456177778729>", row=1)
+}
+
+class TicketControlButton(BlacklistCheck, ui.DynamicItem[ui.Button], template=r'ticket:(?P<action>close|claim|priority):(?P<ticket_id>\d+)'):
+    """Ticket control button that carries its ticket id in its custom_id.
+    
+    Registered once with bot.add_dynamic_items, so no per-ticket view has
+    to be rebuilt at startup.
+    """
+    
+    def __init__(self, bot, action, ticket_id):
+        super().__init__(ui.Button(custom_id=f"ticket:{action}:{ticket_id}", **CONTROL_BUTTONS[action]))
         self.bot = bot
+        self.action = action
         self.ticket_id = ticket_id
     
-    @ui.button(label="Close Ticket", style=discord.ButtonStyle.red, emoji="<:icons_cross:1424794344292094084>", custom_id="persistent_close_ticket", row=0)
-    async def close_ticket(self, interaction: discord.Interaction, button: ui.Button):
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: ui.Button, match):
+        return cls(interaction.client, match['action'], int(match['ticket_id']))
+    
+    async def callback(self, interaction: discord.Interaction):
+        actions = {
+            'close': self.close_ticket,
+            'claim': self.claim_ticket,
+            'priority': self.change_priority
+        }
+        await actions[self.action](interaction)
+    
+    async def close_ticket(self, interaction: discord.Interaction):
         # Check staff permissions
-        ticket_data = self.bot.db.get_ticket(interaction.guild.id, self.ticket_id)
+        ticket_data = await self.bot.db.get_ticket(interaction.guild.id, self.ticket_id)
         if not ticket_data:
             error_embed = create_error_embed("Ticket not found!", interaction.user)
             return await interaction.response.send_message(embed=error_embed, ephemeral=True)
         
-        if not has_staff_role(self.bot, interaction.guild, interaction.user, ticket_data):
+        if not await has_staff_role(self.bot, interaction.guild, interaction.user, ticket_data):
             error_embed = discord.Embed(
                 title=f"{EMOJIS['error']} Permission Denied",
                 description=f"{EMOJIS['warning']} **You don't have permission to close this ticket!**\n"
@@ -222,15 +216,15 @@ class TicketControlView(ui.View):
         confirm_view = CloseConfirmView(self.bot, self.ticket_id)
         await interaction.response.send_message(embed=confirm_embed, view=confirm_view, ephemeral=True)
     
-    @ui.button(label="Claim Ticket", style=discord.ButtonStyle.green, emoji="<:bye:1424995824999596042>", custom_id="persistent_claim_ticket", row=0)
-    async def claim_ticket(self, interaction: discord.Interaction, button: ui.Button):
+    @TICKET_STAGE_SECONDS.time(stage='claim')
+    async def claim_ticket(self, interaction: discord.Interaction):
         # Check staff permissions
-        ticket_data = self.bot.db.get_ticket(interaction.guild.id, self.ticket_id)
+        ticket_data = await self.bot.db.get_ticket(interaction.guild.id, self.ticket_id)
         if not ticket_data:
             error_embed = create_error_embed("Ticket not found!", interaction.user)
             return await interaction.response.send_message(embed=error_embed, ephemeral=True)
         
-        if not has_staff_role(self.bot, interaction.guild, interaction.user, ticket_data):
+        if not await has_staff_role(self.bot, interaction.guild, interaction.user, ticket_data):
             error_embed = discord.Embed(
                 title=f"{EMOJIS['error']} Permission Denied",
                 description=f"{EMOJIS['warning']} **You don't have permission to claim this ticket!**\n"
@@ -250,20 +244,19 @@ class TicketControlView(ui.View):
             )
             return await interaction.response.send_message(embed=error_embed, ephemeral=True)
         
-        self.bot.db.update_ticket(interaction.guild.id, self.ticket_id, claimed_by=interaction.user.id)
+        await self.bot.db.update_ticket(interaction.guild.id, self.ticket_id, claimed_by=interaction.user.id)
         
         claim_embed = create_claim_embed(interaction.user)
         await interaction.response.send_message(embed=claim_embed)
     
-    @ui.button(label="Change Priority", style=discord.ButtonStyle.blurple, emoji="<a:lighting_icons:1424969456177778729>", custom_id="persistent_change_priority", row=1)
-    async def change_priority(self, interaction: discord.Interaction, button: ui.Button):
+    async def change_priority(self, interaction: discord.Interaction):
         # Check staff permissions
-        ticket_data = self.bot.db.get_ticket(interaction.guild.id, self.ticket_id)
+        ticket_data = await self.bot.db.get_ticket(interaction.guild.id, self.ticket_id)
         if not ticket_data:
             error_embed = create_error_embed("Ticket not found!", interaction.user)
             return await interaction.response.send_message(embed=error_embed, ephemeral=True)
         
-        if not has_staff_role(self.bot, interaction.guild, interaction.user, ticket_data):
+        if not await has_staff_role(self.bot, interaction.guild, interaction.user, ticket_data):
             error_embed = discord.Embed(
                 title=f"{EMOJIS['error']} Permission Denied",
                 description=f"{EMOJIS['warning']} **You don't have permission to change ticket priority!**\n"
@@ -285,6 +278,38 @@ class TicketControlView(ui.View):
         
         await interaction.response.send_message(embed=priority_embed, view=priority_view, ephemeral=True)
 
+class TicketControlView(BlacklistCheck, ui.View):
+    def __init__(self, bot, ticket_id):
+        super().__init__(timeout=None)
+        for action in CONTROL_BUTTONS:
+            self.add_item(TicketControlButton(bot, action, ticket_id))
+
+class LegacyTicketControlView(BlacklistCheck, ui.View):
+    """Handles control messages sent before buttons carried their ticket id.
+    
+    Those buttons share one custom_id across all tickets, so the ticket is
+    the channel the button was pressed in.
+    """
+    
+    def __init__(self, bot):
+        super().__init__(timeout=None)
+        self.bot = bot
+    
+    async def _dispatch(self, interaction, action):
+        await TicketControlButton(self.bot, action, interaction.channel.id).callback(interaction)
+    
+    @ui.button(label="Close Ticket", style=discord.ButtonStyle.red, emoji="<:icons_cross:1424794344292094084>", custom_id="persistent_close_ticket", row=0)
+    async def close_ticket(self, interaction: discord.Interaction, button: ui.Button):
+        await self._dispatch(interaction, 'close')
+    
+    @ui.button(label="Claim Ticket", style=discord.ButtonStyle.green, emoji="<:bye:1424995824999596042>", custom_id="persistent_claim_ticket", row=0)
+    async def claim_ticket(self, interaction: discord.Interaction, button: ui.Button):
+        await self._dispatch(interaction, 'claim')
+    
+    @ui.button(label="Change Priority", style=discord.ButtonStyle.blurple, emoji="<a:lighting_icons:1424969456177778729>", custom_id="persistent_change_priority", row=1)
+    async def change_priority(self, interaction: discord.Interaction, button: ui.Button):
+        await self._dispatch(interaction, 'priority')
+
 class TicketControls(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
@@ -1,48 +1,217 @@
 import discord
 from discord.ext import commands
-from utils.embeds import create_error_embed
-from config import THREAD_TICKET
+import asyncio
+from collections import deque
+from utils.embeds import create_error_embed, create_success_embed, create_info_embed, create_ticket_embed, create_log_embed
+from utils.admission import AdmissionController
+from utils.metrics import TICKET_STAGE_SECONDS, TICKET_QUEUE_WAIT_SECONDS, TICKET_QUEUE_REJECTED
+from config import (
+    THREAD_TICKET, PRIORITY_EMOJIS, COLORS, EMOJIS,
+    TICKET_CREATE_RATE, TICKET_CREATE_BURST, TICKET_QUEUE_SIZE, TICKET_QUEUE_UPDATE_INTERVAL
+)
 from datetime import datetime
 
 class TicketCreation(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        # Seconds from modal submit to the "Ticket created" followup
+        self.creation_times = deque(maxlen=500)
+        # Paces ticket creation per guild so a rush queues instead of hitting rate limits
+        self.admission = AdmissionController(
+            TICKET_CREATE_RATE, TICKET_CREATE_BURST, TICKET_QUEUE_SIZE, TICKET_QUEUE_UPDATE_INTERVAL
+        )
+        # (guild_id, user_id) of requests waiting in line or being created
+        self.pending = set()
     
+    def creation_percentiles(self):
+        """Return (p50, p95) of recent ticket creation times in ms, or None"""
+        if not self.creation_times:
+            return None
+        
+        samples = sorted(self.creation_times)
+        def percentile(q):
+            return samples[min(len(samples) - 1, int(q * len(samples)))] * 1000
+        return percentile(0.50), percentile(0.95)
+    
+    async def finish_ticket(self, interaction: discord.Interaction, ticket_channel, ticket_data: dict, mention_text, label):
+        """Save, post and announce a ticket whose channel or thread now exists.
+        
+        The opener is only told about the ticket once it is saved and its
+        messages are posted; if either fails the ticket is rolled back with
+        `discard_ticket`. The log embed doesn't depend on them, so it is posted
+        concurrently. Errors from any step end up here.
+        """
+        from cogs.ticketcontrols import TicketControlView
+        guild = interaction.guild
+        ticket_data['channel_id'] = ticket_channel.id
+        
+        async def post_ticket():
+            # MESSAGE 1: Ticket Embed with Image
+            ticket_embed = create_ticket_embed(interaction.user, ticket_data)
+            await ticket_channel.send(content=mention_text, embed=ticket_embed)
+            
+            # MESSAGE 2: Control Buttons (NO EMBED)
+            control_view = TicketControlView(self.bot, ticket_channel.id)
+            await ticket_channel.send(view=control_view)
+        
+        async def open_ticket():
+            saved = False
+            try:
+                await self.bot.db.create_ticket(guild.id, ticket_channel.id, ticket_data)
+                self.bot.stats.tickets_changed(1)
+                saved = True
+                await post_ticket()
+            except Exception:
+                await self.discard_ticket(guild, ticket_channel, saved)
+                raise
+            
+            success_embed = create_success_embed(
+                f"Ticket created: {ticket_channel.mention}",
+                interaction.user
+            )
+            await interaction.followup.send(embed=success_embed, ephemeral=True)
+            self.creation_times.append((discord.utils.utcnow() - interaction.created_at).total_seconds())
+        
+        async def post_log():
+            logs_channel_id = await self.bot.db.get_ticket_logs_channel(guild.id)
+            logs_channel = guild.get_channel(logs_channel_id) if logs_channel_id else None
+            if not logs_channel:
+                return
+            
+            priority = ticket_data.get('priority', 'medium')
+            priority_emoji = PRIORITY_EMOJIS.get(priority, '🟡')
+            
+            log_embed = create_log_embed(
+                f"{EMOJIS['ticket']} Ticket Created",
+                {
+                    f"{EMOJIS['user']} User": interaction.user.mention,
+                    f"{EMOJIS['category']} Category": ticket_data['category'],
+                    f"{EMOJIS['pencil']} Subject": ticket_data['subject'],
+                    f"{EMOJIS['priority']} Priority": f"{priority_emoji} {priority.title()}",
+                    f"{EMOJIS['ticket']} {label}": ticket_channel.mention
+                },
+                COLORS['green']
+            )
+            await logs_channel.send(embed=log_embed)
+        
+        steps = ("open ticket", "post log")
+        results = await asyncio.gather(open_ticket(), post_log(), return_exceptions=True)
+        
+        for step, result in zip(steps, results):
+            if isinstance(result, Exception):
+                print(f"Error creating ticket {ticket_channel.id} ({step}): {result}")
+        
+        # A missing log entry isn't worth failing the ticket over
+        if isinstance(results[0], Exception):
+            raise results[0]
+    
+    async def discard_ticket(self, guild, ticket_channel, saved):
+        """Undo a ticket that failed to open: nothing is archived or logged"""
+        if saved:
+            try:
+                await self.bot.db.delete_ticket(guild.id, ticket_channel.id, archive=False)
+                self.bot.stats.tickets_changed(-1)
+            except Exception as e:
+                print(f"Error removing ticket {ticket_channel.id}: {e}")
+        
+        transcript_cog = self.bot.get_cog('Transcript')
+        if transcript_cog:
+            await transcript_cog.stop_capture(ticket_channel.id)
+        
+        try:
+            await ticket_channel.delete(reason="Ticket creation failed")
+        except discord.HTTPException as e:
+            print(f"Error deleting channel of failed ticket {ticket_channel.id}: {e}")
+    
+    @TICKET_STAGE_SECONDS.time(stage='create')
     async def handle_ticket_creation(self, interaction: discord.Interaction, ticket_data: dict):
-        panel_config = self.bot.db.get_guild_panel(interaction.guild.id)
+        panel_config = await self.bot.db.get_guild_panel(interaction.guild.id)
         if not panel_config:
             error_embed = create_error_embed("Ticket system not configured!", interaction.user)
             return await interaction.response.send_message(embed=error_embed, ephemeral=True)
         
-        guild_tickets = self.bot.db.get_guild_tickets(interaction.guild.id)
-        for tid, tdata in guild_tickets.items():
-            if tdata['user_id'] == interaction.user.id and not tdata.get('closed'):
-                existing_channel = interaction.guild.get_channel(tdata['channel_id'])
-                if existing_channel:
-                    error_embed = create_error_embed(
-                        f"You already have an open ticket: {existing_channel.mention}",
-                        interaction.user
-                    )
-                    return await interaction.response.send_message(embed=error_embed, ephemeral=True)
+        existing_id = await self.bot.db.get_open_ticket_for_user(interaction.guild.id, interaction.user.id)
+        if existing_id:
+            existing_channel = interaction.guild.get_channel_or_thread(existing_id)
+            if existing_channel:
+                error_embed = create_error_embed(
+                    f"You already have an open ticket: {existing_channel.mention}",
+                    interaction.user
+                )
+                return await interaction.response.send_message(embed=error_embed, ephemeral=True)
+        
+        pending_key = (interaction.guild.id, interaction.user.id)
+        if pending_key in self.pending:
+            error_embed = create_error_embed("Your ticket is already being created, please wait!", interaction.user)
+            return await interaction.response.send_message(embed=error_embed, ephemeral=True)
         
         await interaction.response.defer(ephemeral=True)
         
-        ticket_num = self.bot.db.increment_ticket_counter(interaction.guild.id)
-        
-        ticket_data['panel_image'] = panel_config['panel_data'].get('image')
-        ticket_data['ticket_number'] = ticket_num
-        ticket_data['created_at'] = datetime.utcnow().isoformat()
-        ticket_data['closed'] = False
-        ticket_data['locked'] = False
-        
-        if panel_config.get('thread_ticket', THREAD_TICKET):
-            cog = self.bot.get_cog('ThreadTicket')
-            if cog:
-                await cog.create_thread_ticket(interaction, ticket_data)
-        else:
-            cog = self.bot.get_cog('ChannelTicket')
-            if cog:
-                await cog.create_channel_ticket(interaction, ticket_data)
+        self.pending.add(pending_key)
+        try:
+            if not await self.wait_for_turn(interaction):
+                error_embed = create_error_embed(
+                    "Too many tickets are being opened right now. Please try again in a few minutes!",
+                    interaction.user
+                )
+                return await interaction.followup.send(embed=error_embed, ephemeral=True)
+            
+            try:
+                ticket_num = await self.bot.ticket_counter.next_number(interaction.guild.id)
+            except BaseException:
+                # Nothing was created, so the slot can go to someone else
+                self.admission.release(interaction.guild.id)
+                raise
+            
+            ticket_data['panel_image'] = panel_config['panel_data'].get('image')
+            ticket_data['ticket_number'] = ticket_num
+            ticket_data['created_at'] = datetime.utcnow().isoformat()
+            ticket_data['closed'] = False
+            ticket_data['locked'] = False
+            
+            if panel_config.get('thread_ticket', THREAD_TICKET):
+                cog = self.bot.get_cog('ThreadTicket')
+                if cog:
+                    await cog.create_thread_ticket(interaction, ticket_data)
+            else:
+                cog = self.bot.get_cog('ChannelTicket')
+                if cog:
+                    await cog.create_channel_ticket(interaction, ticket_data)
+        finally:
+            self.pending.discard(pending_key)
+    
+    async def wait_for_turn(self, interaction: discord.Interaction):
+        """Wait until the guild may create another ticket, showing the user their place in line"""
+        queue_message = None
+        
+        async def show_position(position):
+            nonlocal queue_message
+            queue_embed = create_info_embed(
+                "Ticket Queued",
+                "Lots of tickets are being opened right now.\n"
+                f"You are **#{position}** in queue, your ticket will be created shortly."
+            )
+            if queue_message is None:
+                queue_message = await interaction.followup.send(embed=queue_embed, ephemeral=True, wait=True)
+            else:
+                await queue_message.edit(embed=queue_embed)
+        
+        with TICKET_QUEUE_WAIT_SECONDS.time():
+            admitted = await self.admission.acquire(interaction.guild.id, show_position)
+        if not admitted:
+            TICKET_QUEUE_REJECTED.inc()
+        
+        if queue_message is not None:
+            try:
+                await queue_message.delete()
+            except discord.HTTPException:
+                pass
+            except asyncio.CancelledError:
+                if admitted:
+                    self.admission.release(interaction.guild.id)
+                raise
+        
+        return admitted
 
 async def setup(bot):
     await bot.add_cog(TicketCreation(bot))
\ No newline at end of file
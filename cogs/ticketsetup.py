@@ -4,11 +4,12 @@ from discord.ext import commands
 from discord import app_commands
 from utils.embeds import create_preview_embed, create_error_embed, create_success_embed, create_setup_embed
 from utils.views import TicketDropdownView, TicketButtonView
+from utils.blacklist import BlacklistCheck
 from config import COLORS, THREAD_TICKET, EMOJIS
 import asyncio
 import re
 
-class PanelEditView(discord.ui.View):
+class PanelEditView(BlacklistCheck, discord.ui.View):
     def __init__(self, interaction_or_ctx, bot, preview_msg):
         super().__init__(timeout=300)
         self.interaction_or_ctx = interaction_or_ctx
@@ -160,7 +161,7 @@ class PanelEditView(discord.ui.View):
         await interaction.response.send_message(embed=success_embed, ephemeral=True)
         self.stop()
 
-class CategoryManageView(discord.ui.View):
+class CategoryManageView(BlacklistCheck, discord.ui.View):
     def __init__(self, interaction_or_ctx, bot, preview_msg, style, panel_data):
         super().__init__(timeout=600)
         self.interaction_or_ctx = interaction_or_ctx
@@ -243,7 +244,7 @@ class CategoryManageView(discord.ui.View):
             error_embed = create_error_embed("No categories to remove!", self.get_author())
             return await interaction.response.send_message(embed=error_embed, ephemeral=True)
         
-        class RemoveSelect(discord.ui.Select):
+        class RemoveSelect(BlacklistCheck, discord.ui.Select):
             def __init__(self, parent_view):
                 self.parent_view = parent_view
                 options = [
@@ -385,7 +386,7 @@ class CategoryManageView(discord.ui.View):
             await success_msg.delete()
             
             await self.update_preview()
-            
+        
         except asyncio.TimeoutError:
             timeout_msg = await self.get_channel().send(f"{EMOJIS['warning']} Timeout! Category creation cancelled.")
             await asyncio.sleep(3)
@@ -456,7 +457,7 @@ class TicketSetup(commands.Cog):
             'thread_ticket': THREAD_TICKET
         }
         
-        self.bot.db.set_guild_panel(guild.id, panel_config)
+        await self.bot.db.set_guild_panel(guild.id, panel_config)
         
         final_embed = create_preview_embed(panel_view.panel_data)
         await channel.send(embed=final_embed)
@@ -471,7 +472,7 @@ class TicketSetup(commands.Cog):
         logs_channel = discord.utils.get(guild.channels, name="lazyx-ticket-logs")
         if not logs_channel:
             logs_channel = await guild.create_text_channel(name="lazyx-ticket-logs")
-        self.bot.db.set_ticket_logs_channel(guild.id, logs_channel.id)
+        await self.bot.db.set_ticket_logs_channel(guild.id, logs_channel.id)
         
         success_embed = create_success_embed(
             f"{EMOJIS['trophy']} Setup complete in {channel.mention}!\n"
@@ -1,14 +1,147 @@
 import discord
 from discord.ext import commands
+import asyncio
 import chat_exporter
-import io
-from datetime import datetime
+import os
+import time
+from config import TRANSCRIPT_COMPRESSION, TRANSCRIPT_FLUSH_INTERVAL
+from utils.metrics import TRANSCRIPT_SECONDS
+from utils.transcripts import (
+    TranscriptLog, message_record, raw_edit_record,
+    render_transcript, write_transcript, split_file
+)
+
+# Room left under the upload limit for the rest of the request
+UPLOAD_HEADROOM = 64 * 1024
 
 class Transcript(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.log = TranscriptLog()
+        # Ticket channels whose messages are appended to a log as they arrive
+        self.captured = self.log.channel_ids()
+        # channel_id -> newest message logged before this start, to backfill from once ready
+        self.resume_from = {}
+        self.flusher = None
+    
+    async def cog_load(self):
+        # Runs before the gateway connects, so no live message is logged yet
+        self.resume_from = await asyncio.to_thread(
+            lambda: {channel_id: self.log.last_message_id(channel_id) for channel_id in self.captured}
+        )
+        self.flusher = asyncio.create_task(self.flush_logs())
+    
+    async def cog_unload(self):
+        if self.flusher is not None:
+            self.flusher.cancel()
+        await asyncio.to_thread(self.log.close)
+    
+    async def flush_logs(self):
+        while True:
+            await asyncio.sleep(TRANSCRIPT_FLUSH_INTERVAL)
+            try:
+                await asyncio.to_thread(self.log.flush)
+            except Exception as e:
+                print(f"Error writing transcript logs: {e}")
+    
+    async def backfill(self, channel, after_id):
+        """Log messages sent while nothing was capturing them, e.g. during a restart"""
+        after = discord.Object(after_id) if after_id else None
+        async for message in channel.history(limit=None, after=after, oldest_first=True):
+            self.log.append(channel.id, message_record(message))
+    
+    def start_capture(self, channel_id):
+        """Start logging a new ticket channel; call before its first message"""
+        self.log.create(channel_id)
+        self.captured.add(channel_id)
+    
+    async def stop_capture(self, channel_id):
+        self.captured.discard(channel_id)
+        await asyncio.to_thread(self.log.delete, channel_id)
+    
+    @commands.Cog.listener()
+    async def on_message(self, message):
+        if message.channel.id in self.captured:
+            self.log.append(message.channel.id, message_record(message))
+    
+    @commands.Cog.listener()
+    async def on_ready(self):
+        resume_from, self.resume_from = self.resume_from, {}
+        for channel_id, last_id in resume_from.items():
+            channel = self.bot.get_channel(channel_id)
+            # Channels on other clusters' shards are backfilled there
+            if channel is None or channel_id not in self.captured:
+                continue
+            try:
+                await self.backfill(channel, last_id)
+            except Exception as e:
+                print(f"Error backfilling transcript log for {channel_id}: {e}")
+    
+    @commands.Cog.listener()
+    async def on_raw_message_edit(self, payload):
+        # Raw, so edits to messages sent before a restart are caught too;
+        # updates without an edit timestamp are only link embeds resolving
+        if payload.channel_id in self.captured and payload.data.get('edited_timestamp'):
+            self.log.append(payload.channel_id, raw_edit_record(payload.data))
+    
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload):
+        if payload.channel_id in self.captured:
+            self.log.append(payload.channel_id, {'type': 'delete', 'id': payload.message_id})
+    
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel):
+        if channel.id in self.captured:
+            await self.stop_capture(channel.id)
+    
+    @commands.Cog.listener()
+    async def on_raw_thread_delete(self, payload):
+        if payload.thread_id in self.captured:
+            await self.stop_capture(payload.thread_id)
+    
+    def package(self, chunks, filename, part_size, start):
+        """Compress and split a rendered transcript; runs in a worker thread"""
+        fp, filename, size = write_transcript(chunks, filename, TRANSCRIPT_COMPRESSION)
+        stored_size = fp.seek(0, os.SEEK_END)
+        parts = split_file(fp, filename, part_size)
+        
+        stats = {
+            'compression': TRANSCRIPT_COMPRESSION or 'none',
+            'uncompressed_bytes': size,
+            'compressed_bytes': stored_size,
+            'parts': len(parts),
+            'render_ms': round((time.perf_counter() - start) * 1000)
+        }
+        return [discord.File(part, filename=name) for name, part in parts], stats
+    
+    def render_from_log(self, channel, ticket_data, filename, part_size, start):
+        messages = self.log.read(channel.id)
+        chunks = render_transcript(messages, channel.name, ticket_data)
+        return self.package(chunks, filename, part_size, start)
     
+    @TRANSCRIPT_SECONDS.time()
     async def create_transcript(self, channel, ticket_data):
+        """Return (files, stats).
+        
+        `files` are small enough to upload to the channel's guild, one
+        per message. `stats` holds the sizes and render time, for the
+        archive record.
+        """
+        start = time.perf_counter()
+        ticket_num = ticket_data.get('ticket_number', 0)
+        filename = f"ticket-{ticket_num:04d}-transcript.html"
+        part_size = channel.guild.filesize_limit - UPLOAD_HEADROOM
+        
+        # Tickets opened since capture began are rendered from their log,
+        # fetching only history newer than the last message it holds
+        if channel.id in self.captured:
+            try:
+                last_id = await asyncio.to_thread(self.log.last_message_id, channel.id)
+                await self.backfill(channel, last_id)
+                return await asyncio.to_thread(self.render_from_log, channel, ticket_data, filename, part_size, start)
+            except Exception as e:
+                print(f"Error rendering transcript log for {channel.id}: {e}")
+        
         try:
             transcript = await chat_exporter.export(
                 channel,
@@ -18,41 +151,23 @@ class Transcript(commands.Cog):
                 bot=self.bot
             )
             
-            if transcript is None:
-                transcript = await self.create_simple_transcript(channel, ticket_data)
-            
-            ticket_num = ticket_data.get('ticket_number', 0)
-            filename = f"ticket-{ticket_num:04d}-transcript.html"
-            
-            transcript_file = discord.File(
-                io.BytesIO(transcript.encode()),
-                filename=filename
-            )
-            
-            return transcript_file
-            
+            if transcript is not None:
+                return await asyncio.to_thread(self.package, [transcript], filename, part_size, start)
+        
         except Exception as e:
             print(f"Error creating transcript: {e}")
-            return await self.create_simple_transcript(channel, ticket_data)
+        
+        lines = await self.create_simple_transcript(channel, ticket_data)
+        return await asyncio.to_thread(self.package, lines, f"ticket-{ticket_num:04d}-transcript.txt", part_size, start)
     
     async def create_simple_transcript(self, channel, ticket_data):
-        messages = []
+        lines = []
         async for message in channel.history(limit=None, oldest_first=True):
             timestamp = message.created_at.strftime("%Y-%m-%d %H:%M:%S")
             content = message.content or "[No content]"
-            messages.append(f"[{timestamp}] {message.author}: {content}")
-        
-        transcript_text = "".join(messages)
-        
-        ticket_num = ticket_data.get('ticket_number', 0)
-        filename = f"ticket-{ticket_num:04d}-transcript.txt"
-        
-        transcript_file = discord.File(
-            io.BytesIO(transcript_text.encode()),
-            filename=filename
-        )
+            lines.append(f"[{timestamp}] {message.author}: {content}\n")
         
-        return transcript_file
+        return lines
 
 async def setup(bot):
     await bot.add_cog(Transcript(bot))
@@ -12,6 +12,77 @@ DEFAULT_TICKET_CATEGORY = "Tickets"
 
 OWNER_WEBHOOK_URL = os.getenv('OWNER_WEBHOOK_URL')
 
+# Sharding: with SHARD_COUNT unset Discord picks the number of shards. launcher.py runs the
+# bot as several processes ("clusters") and gives each its own shards through these variables
+SHARD_COUNT = int(os.getenv('SHARD_COUNT')) if os.getenv('SHARD_COUNT') else None
+SHARD_IDS = [int(shard) for shard in os.getenv('SHARD_IDS').split(',')] if os.getenv('SHARD_IDS') else None
+CLUSTER_ID = int(os.getenv('CLUSTER_ID', 0))
+CLUSTER_COUNT = int(os.getenv('CLUSTER_COUNT', 1))
+# Local address where the launcher relays stats and events between clusters, and seconds between stats reports
+CLUSTER_IPC_HOST = "127.0.0.1"
+CLUSTER_IPC_PORT = 9200
+CLUSTER_STATS_INTERVAL = 15
+
+# Storage backend: "json" (files under data/), "sharded" (one file per guild) or "sqlite"
+DATABASE_BACKEND = "json"
+SQLITE_DATABASE_PATH = "data/tickets.db"
+
+# Seconds to batch journal records before fsyncing them to disk
+DATABASE_WRITE_DELAY = 1.0
+# Journal records to accumulate before compacting them into the JSON snapshots
+JOURNAL_COMPACT_THRESHOLD = 1000
+# Seconds a guild can go unused before the sharded backend unloads it
+GUILD_IDLE_TIMEOUT = 600
+
+# Tickets closed concurrently, attempts per close, and seconds before the channel is deleted
+CLOSE_WORKERS = 4
+CLOSE_MAX_ATTEMPTS = 5
+CLOSE_DELAY = 5
+# Seconds to wait before starting over on a close that used up its attempts
+CLOSE_RETRY_DELAY = 300
+
+# Compress transcripts before upload: None, "gzip" or "zip"
+TRANSCRIPT_COMPRESSION = None
+# Seconds between writes of captured ticket messages to their transcript logs
+TRANSCRIPT_FLUSH_INTERVAL = 2
+
+# Ticket numbers reserved per database write; up to this many minus one can be skipped on restart
+TICKET_NUMBER_BLOCK = 10
+
+# Ticket creations per second each guild settles to after a burst, and the queue behind it;
+# keep TICKET_QUEUE_SIZE / TICKET_CREATE_RATE well under the 15 minutes an interaction stays valid
+TICKET_CREATE_RATE = 0.5
+TICKET_CREATE_BURST = 5
+TICKET_QUEUE_SIZE = 100
+# Seconds between "#N in queue" updates
+TICKET_QUEUE_UPDATE_INTERVAL = 5
+
+# Seconds between batched owner webhook logs, and how many can wait before new ones are dropped
+OWNER_LOG_FLUSH_INTERVAL = 5
+OWNER_LOG_MAX_PENDING = 1000
+
+# Seconds between replies to bot mentions in one channel, and before the reply embed is rebuilt
+MENTION_COOLDOWN = 10
+MENTION_EMBED_TTL = 300
+
+# Staff members added to a new ticket thread at the same time
+STAFF_ADD_CONCURRENCY = 5
+
+# Local address for the Prometheus /metrics endpoint; set METRICS_PORT to None to turn it off.
+# Cluster N serves on METRICS_PORT + N
+METRICS_HOST = "127.0.0.1"
+METRICS_PORT = 9108
+
+# Seconds between stack samples taken by the profile command
+PROFILE_INTERVAL = 0.005
+
+# Event loop lag watchdog: seconds between lag measurements, lag that counts as a stall
+# (its blocking stack is logged), seconds of lag samples kept, and stalls remembered
+LOOP_WATCHDOG_INTERVAL = 0.1
+LOOP_STALL_THRESHOLD = 0.25
+LOOP_LAG_WINDOW = 600
+LOOP_STALL_HISTORY = 50
+
 REVIEW_ENABLED = True
 TICKET_EMBED_IMAGE = "https://cdn.discordapp.com/attachments/1424289886747365418/1425011587030188096/15946.jpg?ex=68e608f5&is=68e4b775&hm=72f6781501ad4aa2d5d395a3efcde14b9ed952c9d7e52f482dfdc38ffce3ac42&"
 
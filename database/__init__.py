@@ -1,3 +1,17 @@
+from config import DATABASE_BACKEND
+from .aio import AsyncDatabase
 from .db import Database
+from .sharded import ShardedDatabase
+from .sqlite import SQLiteDatabase
 
-__all__ = ['Database']
\ No newline at end of file
+def get_database(backend=DATABASE_BACKEND):
+    """Create the storage backend selected in config.py"""
+    if backend == "sqlite":
+        return SQLiteDatabase()
+    if backend == "json":
+        return Database()
+    if backend == "sharded":
+        return ShardedDatabase()
+    raise ValueError(f"Unknown database backend: {backend}")
+
+__all__ = ['AsyncDatabase', 'Database', 'ShardedDatabase', 'SQLiteDatabase', 'get_database']
\ No newline at end of file
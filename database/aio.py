@@ -0,0 +1,110 @@
+import asyncio
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from utils.metrics import DATABASE_CALL_SECONDS
+
+class AsyncDatabase:
+    """Awaitable front for a storage backend.
+    
+    Every call runs on a single dedicated worker thread, so disk I/O and
+    JSON serialization never block the event loop and writes reach the
+    backend in the order they were awaited. The JSON backend coalesces
+    those writes into one flush per DATABASE_WRITE_DELAY window.
+    """
+    
+    def __init__(self, backend):
+        self.backend = backend
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="database")
+    
+    async def _run(self, method, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        try:
+            return await loop.run_in_executor(self._executor, functools.partial(method, *args, **kwargs))
+        finally:
+            DATABASE_CALL_SECONDS.observe(time.perf_counter() - start, method=method.__name__)
+    
+    async def flush(self):
+        return await self._run(self.backend.flush)
+    
+    async def close(self):
+        await self._run(self.backend.close)
+        self._executor.shutdown(wait=True)
+    
+    # Guild Panel Management
+    async def set_guild_panel(self, guild_id, panel_config):
+        return await self._run(self.backend.set_guild_panel, guild_id, panel_config)
+    
+    async def get_guild_panel(self, guild_id):
+        return await self._run(self.backend.get_guild_panel, guild_id)
+    
+    async def get_guild_panels(self):
+        return await self._run(self.backend.get_guild_panels)
+    
+    async def get_guild_prefix(self, guild_id):
+        return await self._run(self.backend.get_guild_prefix, guild_id)
+    
+    async def set_guild_prefix(self, guild_id, prefix):
+        return await self._run(self.backend.set_guild_prefix, guild_id, prefix)
+    
+    async def increment_ticket_counter(self, guild_id):
+        return await self._run(self.backend.increment_ticket_counter, guild_id)
+    
+    async def reserve_ticket_numbers(self, guild_id, count):
+        return await self._run(self.backend.reserve_ticket_numbers, guild_id, count)
+    
+    async def set_ticket_logs_channel(self, guild_id, channel_id):
+        return await self._run(self.backend.set_ticket_logs_channel, guild_id, channel_id)
+    
+    async def get_ticket_logs_channel(self, guild_id):
+        return await self._run(self.backend.get_ticket_logs_channel, guild_id)
+    
+    # Ticket Management
+    async def create_ticket(self, guild_id, channel_id, ticket_data):
+        return await self._run(self.backend.create_ticket, guild_id, channel_id, ticket_data)
+    
+    async def get_ticket(self, guild_id, channel_id):
+        return await self._run(self.backend.get_ticket, guild_id, channel_id)
+    
+    async def get_guild_tickets(self, guild_id):
+        return await self._run(self.backend.get_guild_tickets, guild_id)
+    
+    async def get_open_ticket_for_user(self, guild_id, user_id):
+        return await self._run(self.backend.get_open_ticket_for_user, guild_id, user_id)
+    
+    async def get_open_tickets(self):
+        return await self._run(self.backend.get_open_tickets)
+    
+    async def update_ticket(self, guild_id, channel_id, **updates):
+        return await self._run(self.backend.update_ticket, guild_id, channel_id, **updates)
+    
+    async def delete_ticket(self, guild_id, channel_id, closed_by=None, archive=True):
+        return await self._run(self.backend.delete_ticket, guild_id, channel_id, closed_by, archive)
+    
+    async def archive_ticket(self, guild_id, channel_id, ticket_data, closed_by=None):
+        return await self._run(self.backend.archive_ticket, guild_id, channel_id, ticket_data, closed_by)
+    
+    async def query_archived_tickets(self, guild_id, limit=50, **filters):
+        return await self._run(self.backend.query_archived_tickets, guild_id, limit, **filters)
+    
+    async def get_archived_tickets(self, guild_id, limit=50):
+        return await self._run(self.backend.get_archived_tickets, guild_id, limit)
+    
+    # Blacklist
+    async def get_blacklist(self):
+        return await self._run(self.backend.get_blacklist)
+    
+    async def add_to_blacklist(self, user_id):
+        return await self._run(self.backend.add_to_blacklist, user_id)
+    
+    async def remove_from_blacklist(self, user_id):
+        return await self._run(self.backend.remove_from_blacklist, user_id)
+    
+    # Statistics
+    async def get_guild_stats(self, guild_id):
+        return await self._run(self.backend.get_guild_stats, guild_id)
+    
+    # Cleanup
+    async def delete_guild_data(self, guild_id):
+        return await self._run(self.backend.delete_guild_data, guild_id)
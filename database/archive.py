@@ -0,0 +1,154 @@
+import json
+import os
+from datetime import datetime
+
+CHUNK_SIZE = 64 * 1024
+
+class Archive:
+    """Closed tickets as JSON Lines, one append-only file per guild per month.
+    
+    Records are never rewritten. Queries read segments newest-first and
+    each segment from its end, so fetching the latest page only touches
+    the tail of the newest file.
+    """
+    
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+    
+    def _guild_dir(self, guild_id):
+        return os.path.join(self.root, str(guild_id))
+    
+    def _segments(self, guild_id):
+        """Return (month, path) for every segment of a guild, newest first"""
+        guild_dir = self._guild_dir(guild_id)
+        try:
+            filenames = os.listdir(guild_dir)
+        except FileNotFoundError:
+            return []
+        
+        segments = []
+        for filename in filenames:
+            month, ext = os.path.splitext(filename)
+            if ext == '.jsonl':
+                segments.append((month, os.path.join(guild_dir, filename)))
+        return sorted(segments, reverse=True)
+    
+    def append(self, guild_id, record):
+        self.extend(guild_id, [record])
+    
+    def extend(self, guild_id, records):
+        """Append records to their month's segment and fsync them"""
+        by_month = {}
+        for record in records:
+            month = record.get('closed_at', '')[:7] or 'unknown'
+            by_month.setdefault(month, []).append(json.dumps(record, ensure_ascii=False))
+        
+        guild_dir = self._guild_dir(guild_id)
+        os.makedirs(guild_dir, exist_ok=True)
+        
+        for month, lines in by_month.items():
+            data = ("\n".join(lines) + "\n").encode('utf-8')
+            with open(os.path.join(guild_dir, f"{month}.jsonl"), 'a+b') as f:
+                # Don't glue the new records onto a line torn by a crash
+                if f.seek(0, os.SEEK_END) > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        data = b"\n" + data
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+    
+    def count(self, guild_id):
+        total = 0
+        for _, path in self._segments(guild_id):
+            with open(path, 'rb') as f:
+                while True:
+                    chunk = f.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    total += chunk.count(b"\n")
+        return total
+    
+    def query(self, guild_id, limit=50, before=None, since=None, until=None, category=None, closed_by=None):
+        """Return (records, cursor) newest first.
+        
+        `before` is a cursor from a previous call; pass the returned cursor
+        to fetch the next page. It is None once there is nothing older.
+        `since`/`until` are datetimes or ISO strings matched against closed_at.
+        """
+        if isinstance(since, datetime):
+            since = since.isoformat()
+        if isinstance(until, datetime):
+            until = until.isoformat()
+        
+        before_month, before_offset = None, None
+        if before:
+            before_month, _, offset = before.partition(':')
+            before_offset = int(offset)
+        
+        records = []
+        for month, path in self._segments(guild_id):
+            if before_month and month > before_month:
+                continue
+            if until and month > until[:7]:
+                continue
+            if since and month < since[:7]:
+                break
+            
+            end = before_offset if month == before_month else None
+            for offset, record in self._read_backwards(path, end):
+                closed_at = record.get('closed_at', '')
+                if until and closed_at > until:
+                    continue
+                if since and closed_at < since:
+                    # Segments are in closing order, so everything further back is older
+                    return records, None
+                if category is not None and record.get('category') != category:
+                    continue
+                if closed_by is not None and record.get('closed_by') != closed_by:
+                    continue
+                
+                records.append(record)
+                if len(records) >= limit:
+                    return records, f"{month}:{offset}"
+        
+        return records, None
+    
+    def _read_backwards(self, path, end=None):
+        """Yield (offset, record) from `end` (default: end of file) back to the start"""
+        with open(path, 'rb') as f:
+            position = f.seek(0, os.SEEK_END) if end is None else end
+            carry = b""
+            
+            while position > 0:
+                size = min(CHUNK_SIZE, position)
+                position -= size
+                f.seek(position)
+                chunk = f.read(size) + carry
+                
+                # The first piece may be the tail of a line that starts in
+                # an earlier chunk, so hold it back until that is read
+                lines = chunk.split(b"\n")
+                carry = lines.pop(0)
+                line_end = position + len(chunk)
+                
+                for line in reversed(lines):
+                    line_start = line_end - len(line)
+                    record = self._decode(line)
+                    if record is not None:
+                        yield line_start, record
+                    line_end = line_start - 1
+            
+            record = self._decode(carry)
+            if record is not None:
+                yield 0, record
+    
+    def _decode(self, line):
+        if not line.strip():
+            return None
+        try:
+            return json.loads(line)
+        except ValueError:
+            # A torn final line from a crash mid-append
+            return None
@@ -1,154 +1,442 @@
+import functools
 import json
 import os
+import threading
 from datetime import datetime
+from config import DATABASE_WRITE_DELAY, JOURNAL_COMPACT_THRESHOLD
+from .archive import Archive
+from .journal import Journal
+
+def synchronized(method):
+    """Run a Database method while holding its lock"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
 
 class Database:
-    def __init__(self):
+    def __init__(self, write_delay=DATABASE_WRITE_DELAY, compact_threshold=JOURNAL_COMPACT_THRESHOLD):
         self.data_dir = "data"
         self.guilds_file = os.path.join(self.data_dir, "guilds.json")
         self.tickets_file = os.path.join(self.data_dir, "tickets.json")
         self.logs_file = os.path.join(self.data_dir, "logs.json")
+        self.journal_file = os.path.join(self.data_dir, "journal.log")
+        self.blacklist_file = os.path.join(self.data_dir, "blacklist.json")
+        self.archive_dir = os.path.join(self.data_dir, "archive")
         
-        os.makedirs(self.data_dir, exist_ok=True)
-        
-        if not os.path.exists(self.guilds_file):
-            self._save_json(self.guilds_file, {})
+        # Documents live in memory. Every mutation is appended to the
+        # journal, which is fsynced in batches every `write_delay` seconds;
+        # the documents themselves are only rewritten (atomically) once the
+        # journal holds `compact_threshold` records, or on close().
+        self.write_delay = write_delay
+        self.compact_threshold = compact_threshold
+        self._lock = threading.RLock()
+        self._dirty = set()
+        self._blacklist_dirty = False
+        self._flush_timer = None
+        # (guild_id, user_id) -> channel_id of that user's open ticket
+        self._open_by_user = {}
         
-        if not os.path.exists(self.tickets_file):
-            self._save_json(self.tickets_file, {})
+        os.makedirs(self.data_dir, exist_ok=True)
+        # Closed tickets go straight to append-only files and never sit in memory
+        self.archive = Archive(self.archive_dir)
+        self._load_snapshots()
+        self._load_blacklist()
         
-        if not os.path.exists(self.logs_file):
-            self._save_json(self.logs_file, {})
+        self.journal = Journal(self.journal_file)
+        self._replay_journal()
     
-    def _load_json(self, filepath):
+    def _read_file(self, filepath):
         try:
             with open(filepath, 'r', encoding='utf-8') as f:
                 return json.load(f)
-        except:
+        except Exception as e:
+            # Snapshots are replaced atomically, so this is not a torn write.
+            # Keep the file for inspection instead of silently overwriting it.
+            print(f"Error loading {filepath}: {e}")
+            os.replace(filepath, filepath + ".corrupt")
             return {}
     
-    def _save_json(self, filepath, data):
-        try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=4, ensure_ascii=False)
-        except Exception as e:
-            print(f"Error saving to {filepath}: {e}")
+    def _write_file(self, filepath, data):
+        if not isinstance(data, str):
+            data = json.dumps(data, indent=4, ensure_ascii=False)
+        
+        temp_path = filepath + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, filepath)
     
-    # Guild Panel Management
-    def set_guild_panel(self, guild_id, panel_config):
-        guilds = self._load_json(self.guilds_file)
-        guild_id = str(guild_id)
+    # Storage layout
+    #
+    # The methods below are the only ones that know how guild documents
+    # map onto files. `kind` is either 'config' or 'tickets'.
+    def _load_snapshots(self):
+        self._files = {
+            'config': self.guilds_file,
+            'tickets': self.tickets_file
+        }
+        self._cache = {}
+        
+        for kind, filepath in self._files.items():
+            if not os.path.exists(filepath):
+                self._write_file(filepath, {})
+            self._cache[kind] = self._read_file(filepath)
         
-        if guild_id not in guilds:
-            guilds[guild_id] = {}
+        # The original store kept the blacklist among the guild configs
+        if 'blacklist' in self._cache['config']:
+            blacklist = self._cache['config'].pop('blacklist')
+            if not os.path.exists(self.blacklist_file):
+                self._write_file(self.blacklist_file, blacklist)
+            self._write_file(self.guilds_file, self._cache['config'])
         
-        guilds[guild_id].update(panel_config)
-        guilds[guild_id]['ticket_counter'] = guilds[guild_id].get('ticket_counter', 0)
+        for guild_id, guild_tickets in self._iter_guild_docs('tickets'):
+            for channel_id, ticket in guild_tickets.items():
+                self._index_ticket(guild_id, channel_id, ticket)
         
-        self._save_json(self.guilds_file, guilds)
+        if os.path.exists(self.logs_file):
+            self._migrate_logs(self._read_file(self.logs_file))
+            os.replace(self.logs_file, self.logs_file + ".migrated")
     
-    def get_guild_panel(self, guild_id):
-        guilds = self._load_json(self.guilds_file)
-        return guilds.get(str(guild_id))
+    def _migrate_logs(self, logs):
+        """Move archived tickets from the old logs.json layout into the archive"""
+        for guild_id, guild_logs in logs.items():
+            if guild_logs:
+                self.archive.extend(guild_id, guild_logs)
     
-    def increment_ticket_counter(self, guild_id):
-        guilds = self._load_json(self.guilds_file)
-        guild_id = str(guild_id)
+    def _guild_doc(self, kind, guild_id, create=False):
+        """Return one guild's config dict or tickets dict"""
+        doc = self._cache[kind]
+        if create and guild_id not in doc:
+            doc[guild_id] = {}
+        return doc.get(guild_id)
+    
+    def _drop_guild_doc(self, kind, guild_id):
+        return self._cache[kind].pop(guild_id, None)
+    
+    def _iter_guild_docs(self, kind):
+        return list(self._cache[kind].items())
+    
+    def _mark_dirty(self, kind, guild_id):
+        self._dirty.add(kind)
+    
+    def _write_snapshots(self):
+        for kind in list(self._dirty):
+            self._write_file(self._files[kind], self._cache[kind])
+            self._dirty.discard(kind)
+    
+    # Blacklist
+    #
+    # Kept apart from guild data as a set in data/blacklist.json
+    def _load_blacklist(self):
+        if os.path.exists(self.blacklist_file):
+            self._blacklist = set(self._read_file(self.blacklist_file) or [])
+        else:
+            self._blacklist = set()
+            self._write_blacklist()
+    
+    def _write_blacklist(self):
+        self._write_file(self.blacklist_file, sorted(self._blacklist))
+        self._blacklist_dirty = False
+    
+    # Journal
+    def _replay_journal(self):
+        replayed = 0
+        for record in self.journal.replay():
+            self._apply(record)
+            replayed += 1
+        
+        if replayed:
+            print(f"Replayed {replayed} journal records")
+            self.compact()
+    
+    def _index_ticket(self, guild_id, channel_id, ticket):
+        key = (guild_id, ticket.get('user_id'))
+        if ticket.get('closed', False):
+            if self._open_by_user.get(key) == channel_id:
+                del self._open_by_user[key]
+        else:
+            self._open_by_user[key] = channel_id
+    
+    def _unindex_ticket(self, guild_id, channel_id, ticket):
+        key = (guild_id, ticket.get('user_id'))
+        if self._open_by_user.get(key) == channel_id:
+            del self._open_by_user[key]
+    
+    def _unindex_guild(self, guild_id):
+        for key in [key for key in self._open_by_user if key[0] == guild_id]:
+            del self._open_by_user[key]
+    
+    def _commit(self, record):
+        self._apply(record)
+        self.journal.append(record)
+        self._schedule_flush()
+    
+    def _apply(self, record):
+        """Apply one journal record to the in-memory documents.
+        
+        Records carry absolute values, so replaying a record that is
+        already part of the snapshot leaves the documents unchanged.
+        """
+        op = record['op']
+        guild_id = record.get('guild_id')
         
-        if guild_id not in guilds:
-            guilds[guild_id] = {'ticket_counter': 0}
+        if op == 'update_guild':
+            self._guild_doc('config', guild_id, create=True).update(record['updates'])
+            self._mark_dirty('config', guild_id)
         
-        guilds[guild_id]['ticket_counter'] = guilds[guild_id].get('ticket_counter', 0) + 1
-        counter = guilds[guild_id]['ticket_counter']
+        elif op == 'blacklist_add':
+            self._blacklist.add(record['user_id'])
+            self._blacklist_dirty = True
         
-        self._save_json(self.guilds_file, guilds)
-        return counter
+        elif op == 'blacklist_remove':
+            self._blacklist.discard(record['user_id'])
+            self._blacklist_dirty = True
+        
+        elif op == 'create':
+            ticket = dict(record['ticket'])
+            self._guild_doc('tickets', guild_id, create=True)[record['channel_id']] = ticket
+            self._index_ticket(guild_id, record['channel_id'], ticket)
+            self._mark_dirty('tickets', guild_id)
+        
+        elif op == 'update':
+            ticket = (self._guild_doc('tickets', guild_id) or {}).get(record['channel_id'])
+            if ticket is not None:
+                ticket.update(record['updates'])
+                self._index_ticket(guild_id, record['channel_id'], ticket)
+                self._mark_dirty('tickets', guild_id)
+        
+        elif op == 'delete':
+            ticket = (self._guild_doc('tickets', guild_id) or {}).pop(record['channel_id'], None)
+            if ticket is not None:
+                self._unindex_ticket(guild_id, record['channel_id'], ticket)
+                self._mark_dirty('tickets', guild_id)
+        
+        elif op == 'delete_guild':
+            for kind in ('config', 'tickets'):
+                if self._drop_guild_doc(kind, guild_id):
+                    self._mark_dirty(kind, guild_id)
+            self._unindex_guild(guild_id)
     
-    def set_ticket_logs_channel(self, guild_id, channel_id):
-        guilds = self._load_json(self.guilds_file)
-        guild_id = str(guild_id)
+    def _schedule_flush(self):
+        if self._flush_timer is not None:
+            return
         
-        if guild_id not in guilds:
-            guilds[guild_id] = {}
+        self._flush_timer = threading.Timer(self.write_delay, self.flush)
+        self._flush_timer.daemon = True
+        self._flush_timer.start()
+    
+    def flush(self):
+        """Fsync pending journal records, compacting once the journal is large"""
+        with self._lock:
+            self._flush_timer = None
+            
+            try:
+                self.journal.sync()
+            except Exception as e:
+                print(f"Error syncing journal {self.journal_file}: {e}")
+                return
+            
+            if self.journal.size >= self.compact_threshold:
+                self.compact()
+    
+    def compact(self):
+        """Snapshot dirty documents with temp-file-plus-rename, then truncate the journal"""
+        with self._lock:
+            try:
+                self._write_snapshots()
+                if self._blacklist_dirty:
+                    self._write_blacklist()
+            except Exception as e:
+                # The journal still holds every record, so nothing is lost
+                print(f"Error writing snapshot: {e}")
+                return
+            
+            self.journal.reset()
+    
+    def close(self):
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            self.journal.sync()
+            self.compact()
+            self.journal.close()
+    
+    def _update_guild(self, guild_id, **updates):
+        self._commit({'op': 'update_guild', 'guild_id': str(guild_id), 'updates': updates})
+    
+    # Guild Panel Management
+    @synchronized
+    def set_guild_panel(self, guild_id, panel_config):
+        # The counter only moves through reserve_ticket_numbers
+        updates = {key: value for key, value in panel_config.items() if key != 'ticket_counter'}
+        self._update_guild(guild_id, **updates)
+    
+    @synchronized
+    def get_guild_panel(self, guild_id):
+        guild_data = self._guild_doc('config', str(guild_id))
+        return dict(guild_data) if guild_data else None
+    
+    @synchronized
+    def get_guild_panels(self):
+        """Return every guild that has a deployed ticket panel"""
+        return {
+            guild_id: dict(guild_data)
+            for guild_id, guild_data in self._iter_guild_docs('config')
+            if 'categories' in guild_data
+        }
+    
+    @synchronized
+    def get_guild_prefix(self, guild_id):
+        guild_data = self._guild_doc('config', str(guild_id)) or {}
+        return guild_data.get('prefix')
+    
+    @synchronized
+    def set_guild_prefix(self, guild_id, prefix):
+        self._update_guild(guild_id, prefix=prefix)
+    
+    @synchronized
+    def increment_ticket_counter(self, guild_id):
+        return self.reserve_ticket_numbers(guild_id, 1)
+    
+    @synchronized
+    def reserve_ticket_numbers(self, guild_id, count):
+        """Advance the counter by `count` and return the first number of the block"""
+        guild_data = self._guild_doc('config', str(guild_id)) or {}
+        first = guild_data.get('ticket_counter', 0) + 1
         
-        guilds[guild_id]['logs_channel_id'] = channel_id
-        self._save_json(self.guilds_file, guilds)
+        self._update_guild(guild_id, ticket_counter=first + count - 1)
+        return first
+    
+    @synchronized
+    def set_ticket_logs_channel(self, guild_id, channel_id):
+        self._update_guild(guild_id, logs_channel_id=channel_id)
     
+    @synchronized
     def get_ticket_logs_channel(self, guild_id):
-        guilds = self._load_json(self.guilds_file)
-        guild_data = guilds.get(str(guild_id), {})
+        guild_data = self._guild_doc('config', str(guild_id)) or {}
         return guild_data.get('logs_channel_id')
     
     # Ticket Management
+    @synchronized
     def create_ticket(self, guild_id, channel_id, ticket_data):
-        tickets = self._load_json(self.tickets_file)
-        guild_id = str(guild_id)
-        channel_id = str(channel_id)
-        
-        if guild_id not in tickets:
-            tickets[guild_id] = {}
-        
         ticket_data['created_at'] = datetime.utcnow().isoformat()
         ticket_data['closed'] = False
-        tickets[guild_id][channel_id] = ticket_data
         
-        self._save_json(self.tickets_file, tickets)
+        self._commit({
+            'op': 'create',
+            'guild_id': str(guild_id),
+            'channel_id': str(channel_id),
+            'ticket': ticket_data
+        })
     
+    @synchronized
     def get_ticket(self, guild_id, channel_id):
-        tickets = self._load_json(self.tickets_file)
-        guild_tickets = tickets.get(str(guild_id), {})
-        return guild_tickets.get(str(channel_id))
+        guild_tickets = self._guild_doc('tickets', str(guild_id)) or {}
+        ticket = guild_tickets.get(str(channel_id))
+        # Hand out a copy so callers can't mutate the cached document
+        return dict(ticket) if ticket else None
     
+    @synchronized
     def get_guild_tickets(self, guild_id):
-        tickets = self._load_json(self.tickets_file)
-        return tickets.get(str(guild_id), {})
+        return dict(self._guild_doc('tickets', str(guild_id)) or {})
     
-    def update_ticket(self, guild_id, channel_id, **updates):
-        tickets = self._load_json(self.tickets_file)
+    @synchronized
+    def get_open_ticket_for_user(self, guild_id, user_id):
+        """Return the channel id of the user's open ticket in this guild, if any"""
         guild_id = str(guild_id)
-        channel_id = str(channel_id)
+        # Make sure the guild's tickets (and so its index entries) are loaded
+        self._guild_doc('tickets', guild_id)
         
-        if guild_id in tickets and channel_id in tickets[guild_id]:
-            tickets[guild_id][channel_id].update(updates)
-            self._save_json(self.tickets_file, tickets)
+        channel_id = self._open_by_user.get((guild_id, user_id))
+        return int(channel_id) if channel_id else None
+    
+    @synchronized
+    def get_open_tickets(self):
+        """Return {guild_id: {channel_id: ticket}} for every open ticket"""
+        return {
+            guild_id: {
+                channel_id: dict(ticket)
+                for channel_id, ticket in guild_tickets.items()
+                if not ticket.get('closed', False)
+            }
+            for guild_id, guild_tickets in self._iter_guild_docs('tickets')
+        }
     
-    def delete_ticket(self, guild_id, channel_id):
-        tickets = self._load_json(self.tickets_file)
+    @synchronized
+    def update_ticket(self, guild_id, channel_id, **updates):
         guild_id = str(guild_id)
         channel_id = str(channel_id)
         
-        if guild_id in tickets and channel_id in tickets[guild_id]:
-            # Archive ticket before deleting
-            self.archive_ticket(guild_id, channel_id, tickets[guild_id][channel_id])
-            del tickets[guild_id][channel_id]
-            self._save_json(self.tickets_file, tickets)
+        if channel_id in (self._guild_doc('tickets', guild_id) or {}):
+            self._commit({'op': 'update', 'guild_id': guild_id, 'channel_id': channel_id, 'updates': updates})
     
-    def archive_ticket(self, guild_id, channel_id, ticket_data):
-        logs = self._load_json(self.logs_file)
+    @synchronized
+    def delete_ticket(self, guild_id, channel_id, closed_by=None, archive=True):
+        """Remove a ticket, archiving it unless `archive` is False (a ticket that never opened)"""
         guild_id = str(guild_id)
+        channel_id = str(channel_id)
+        ticket = (self._guild_doc('tickets', guild_id) or {}).get(channel_id)
         
-        if guild_id not in logs:
-            logs[guild_id] = []
-        
+        if ticket is not None:
+            self._commit({'op': 'delete', 'guild_id': guild_id, 'channel_id': channel_id})
+            if archive:
+                # The archive can't be un-appended on replay, so the delete must be
+                # on disk first or a crash in between would archive the ticket twice
+                self.journal.sync()
+                self.archive_ticket(guild_id, channel_id, dict(ticket), closed_by)
+    
+    @synchronized
+    def archive_ticket(self, guild_id, channel_id, ticket_data, closed_by=None):
         ticket_data['closed_at'] = datetime.utcnow().isoformat()
         ticket_data['channel_id'] = str(channel_id)
-        logs[guild_id].append(ticket_data)
+        ticket_data['closed_by'] = closed_by
         
-        self._save_json(self.logs_file, logs)
+        self.archive.append(str(guild_id), ticket_data)
+    
+    @synchronized
+    def query_archived_tickets(self, guild_id, limit=50, before=None, since=None, until=None, category=None, closed_by=None):
+        """Return (tickets, cursor) newest first; pass cursor as `before` for the next page"""
+        return self.archive.query(
+            str(guild_id), limit, before=before, since=since, until=until, category=category, closed_by=closed_by
+        )
     
+    @synchronized
     def get_archived_tickets(self, guild_id, limit=50):
-        logs = self._load_json(self.logs_file)
-        guild_logs = logs.get(str(guild_id), [])
-        return guild_logs[-limit:]
+        tickets, _ = self.query_archived_tickets(guild_id, limit)
+        return tickets[::-1]
+    
+    # Blacklist
+    @synchronized
+    def get_blacklist(self):
+        return list(self._blacklist)
+    
+    @synchronized
+    def add_to_blacklist(self, user_id):
+        if user_id in self._blacklist:
+            return False
+        
+        self._commit({'op': 'blacklist_add', 'user_id': user_id})
+        return True
+    
+    @synchronized
+    def remove_from_blacklist(self, user_id):
+        if user_id not in self._blacklist:
+            return False
+        
+        self._commit({'op': 'blacklist_remove', 'user_id': user_id})
+        return True
     
     # Statistics
+    @synchronized
     def get_guild_stats(self, guild_id):
-        tickets = self._load_json(self.tickets_file)
-        logs = self._load_json(self.logs_file)
         guild_id = str(guild_id)
         
-        active_tickets = len(tickets.get(guild_id, {}))
-        closed_tickets = len(logs.get(guild_id, []))
+        active_tickets = len(self._guild_doc('tickets', guild_id) or {})
+        closed_tickets = self.archive.count(guild_id)
         
         return {
             'active_tickets': active_tickets,
@@ -157,19 +445,7 @@ class Database:
         }
     
     # Cleanup
+    @synchronized
     def delete_guild_data(self, guild_id):
-        guild_id = str(guild_id)
-        
-        # Remove from guilds
-        guilds = self._load_json(self.guilds_file)
-        if guild_id in guilds:
-            del guilds[guild_id]
-            self._save_json(self.guilds_file, guilds)
-        
-        # Remove tickets
-        tickets = self._load_json(self.tickets_file)
-        if guild_id in tickets:
-            del tickets[guild_id]
-            self._save_json(self.tickets_file, tickets)
-        
-        # Keep logs for record keeping
\ No newline at end of file
+        # Removes guild config and tickets; keep the archive for record keeping
+        self._commit({'op': 'delete_guild', 'guild_id': str(guild_id)})
\ No newline at end of file
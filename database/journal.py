@@ -0,0 +1,76 @@
+import json
+import os
+
+class Journal:
+    """Append-only log of database mutations, one JSON record per line"""
+    
+    def __init__(self, path):
+        self.path = path
+        self.size = 0
+        self._buffer = []
+        self._file = open(path, 'a', encoding='utf-8')
+    
+    def append(self, record):
+        # Serialize now so later changes to the caller's dicts can't leak in
+        self._buffer.append(json.dumps(record, ensure_ascii=False))
+    
+    def sync(self):
+        """Write buffered records and fsync them as one batch"""
+        if not self._buffer:
+            return
+        
+        self._file.write("\n".join(self._buffer) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        
+        self.size += len(self._buffer)
+        self._buffer.clear()
+    
+    def replay(self):
+        """Yield every record that made it to disk.
+        
+        A torn final line from a crash mid-append is cut off the file, so
+        the next sync doesn't glue its first record onto the fragment.
+        """
+        try:
+            with open(self.path, 'rb') as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return
+        
+        # Byte offset just past the last intact record
+        end = 0
+        last = b""
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # Everything before the torn line is intact
+                print(f"Dropping incomplete journal record in {self.path}")
+                break
+            
+            end += len(line)
+            last = line
+            self.size += 1
+            yield record
+        
+        if end < sum(len(line) for line in lines):
+            os.truncate(self.path, end)
+        if last and not last.endswith(b"\n"):
+            # An intact record whose newline never reached the disk
+            with open(self.path, 'ab') as f:
+                f.write(b"\n")
+                f.flush()
+                os.fsync(f.fileno())
+    
+    def reset(self):
+        """Drop all records once they are captured in a snapshot"""
+        self._buffer.clear()
+        self._file.seek(0)
+        self._file.truncate()
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.size = 0
+    
+    def close(self):
+        self._file.close()
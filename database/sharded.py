@@ -0,0 +1,154 @@
+import os
+import threading
+import time
+from config import GUILD_IDLE_TIMEOUT
+from .db import Database, synchronized
+
+class ShardedDatabase(Database):
+    """JSON store with one file per guild under data/guilds/.
+    
+    A guild's file is loaded on first access and dropped from memory once it
+    has been idle for `idle_timeout` seconds, so the cost of an operation
+    depends on that guild's size rather than on every guild the bot serves.
+    Mutations still go through the shared journal.
+    """
+    
+    def __init__(self, idle_timeout=GUILD_IDLE_TIMEOUT, **kwargs):
+        self.idle_timeout = idle_timeout
+        self._eviction_timer = None
+        super().__init__(**kwargs)
+    
+    def _load_snapshots(self):
+        self.shard_dir = os.path.join(self.data_dir, "guilds")
+        os.makedirs(self.shard_dir, exist_ok=True)
+        
+        self._shards = {}
+        self._last_access = {}
+        
+        self._migrate_single_file_store()
+    
+    def _migrate_single_file_store(self):
+        """Split an existing guilds/tickets/logs.json store into per-guild files"""
+        if not os.path.exists(self.guilds_file) or os.listdir(self.shard_dir):
+            return
+        
+        legacy = {
+            'config': self._read_file(self.guilds_file),
+            'tickets': self._read_file(self.tickets_file) if os.path.exists(self.tickets_file) else {}
+        }
+        if os.path.exists(self.logs_file):
+            self._migrate_logs(self._read_file(self.logs_file))
+        
+        blacklist = legacy['config'].pop('blacklist', [])
+        if not os.path.exists(self.blacklist_file):
+            self._write_file(self.blacklist_file, blacklist)
+        
+        guild_ids = set()
+        for kind in legacy:
+            guild_ids.update(legacy[kind])
+        
+        for guild_id in guild_ids:
+            shard = self._empty_shard()
+            for kind in legacy:
+                shard[kind] = legacy[kind].get(guild_id, shard[kind])
+            self._write_file(self._shard_path(guild_id), shard)
+        
+        for filepath in (self.guilds_file, self.tickets_file, self.logs_file):
+            if os.path.exists(filepath):
+                os.replace(filepath, filepath + ".migrated")
+        
+        print(f"Migrated {len(guild_ids)} guilds into {self.shard_dir}")
+    
+    def _shard_path(self, guild_id):
+        return os.path.join(self.shard_dir, f"{guild_id}.json")
+    
+    def _empty_shard(self):
+        return {'config': {}, 'tickets': {}}
+    
+    def _shard(self, guild_id):
+        shard = self._shards.get(guild_id)
+        
+        if shard is None:
+            shard = self._empty_shard()
+            path = self._shard_path(guild_id)
+            if os.path.exists(path):
+                shard.update(self._read_file(path))
+            
+            self._shards[guild_id] = shard
+            for channel_id, ticket in shard['tickets'].items():
+                self._index_ticket(guild_id, channel_id, ticket)
+            self._schedule_eviction()
+        
+        self._last_access[guild_id] = time.monotonic()
+        return shard
+    
+    def _guild_doc(self, kind, guild_id, create=False):
+        return self._shard(guild_id)[kind]
+    
+    def _drop_guild_doc(self, kind, guild_id):
+        shard = self._shard(guild_id)
+        old = shard[kind]
+        shard[kind] = self._empty_shard()[kind]
+        return old
+    
+    def _iter_guild_docs(self, kind):
+        """Every guild's document; files that aren't loaded are read without caching them"""
+        docs = [(guild_id, shard[kind]) for guild_id, shard in self._shards.items()]
+        
+        for filename in os.listdir(self.shard_dir):
+            guild_id, ext = os.path.splitext(filename)
+            if ext == '.json' and guild_id not in self._shards:
+                shard = self._read_file(os.path.join(self.shard_dir, filename))
+                docs.append((guild_id, shard.get(kind, self._empty_shard()[kind])))
+        
+        return docs
+    
+    def _mark_dirty(self, kind, guild_id):
+        self._dirty.add(guild_id)
+    
+    def _write_snapshots(self):
+        for guild_id in list(self._dirty):
+            self._write_file(self._shard_path(guild_id), self._shards[guild_id])
+            self._dirty.discard(guild_id)
+    
+    def _schedule_eviction(self):
+        if self._eviction_timer is not None:
+            return
+        
+        self._eviction_timer = threading.Timer(self.idle_timeout / 2, self.evict_idle_guilds)
+        self._eviction_timer.daemon = True
+        self._eviction_timer.start()
+    
+    @synchronized
+    def evict_idle_guilds(self):
+        """Drop guilds that haven't been touched for `idle_timeout` seconds"""
+        self._eviction_timer = None
+        cutoff = time.monotonic() - self.idle_timeout
+        
+        for guild_id, last_access in list(self._last_access.items()):
+            if last_access >= cutoff:
+                continue
+            
+            if guild_id in self._dirty:
+                # Journal records replay onto a newer snapshot unchanged, so
+                # the guild can be written now rather than at the next compaction
+                try:
+                    self._write_file(self._shard_path(guild_id), self._shards[guild_id])
+                except Exception as e:
+                    print(f"Error writing guild {guild_id} before eviction: {e}")
+                    continue
+                self._dirty.discard(guild_id)
+            
+            del self._shards[guild_id]
+            del self._last_access[guild_id]
+            self._unindex_guild(guild_id)
+        
+        if self._shards:
+            self._schedule_eviction()
+    
+    def close(self):
+        with self._lock:
+            if self._eviction_timer is not None:
+                self._eviction_timer.cancel()
+                self._eviction_timer = None
+            super().close()
@@ -0,0 +1,357 @@
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from config import SQLITE_DATABASE_PATH
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS guilds (
+    guild_id INTEGER PRIMARY KEY,
+    config TEXT NOT NULL DEFAULT '{}',
+    ticket_counter INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS tickets (
+    guild_id INTEGER NOT NULL,
+    channel_id INTEGER NOT NULL,
+    user_id INTEGER,
+    closed INTEGER NOT NULL DEFAULT 0,
+    data TEXT NOT NULL
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_tickets_channel ON tickets (guild_id, channel_id);
+CREATE INDEX IF NOT EXISTS idx_tickets_user ON tickets (guild_id, user_id, closed);
+
+CREATE TABLE IF NOT EXISTS archived_tickets (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    guild_id INTEGER NOT NULL,
+    channel_id INTEGER NOT NULL,
+    closed_at TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_archived_closed_at ON archived_tickets (guild_id, closed_at);
+CREATE INDEX IF NOT EXISTS idx_archived_guild ON archived_tickets (guild_id, id);
+
+CREATE TABLE IF NOT EXISTS blacklist (
+    user_id INTEGER PRIMARY KEY
+);
+"""
+
+class SQLiteDatabase:
+    """Drop-in replacement for Database that stores one row per ticket"""
+    
+    def __init__(self, path=SQLITE_DATABASE_PATH):
+        self.path = path
+        self.data_dir = os.path.dirname(path) or "."
+        os.makedirs(self.data_dir, exist_ok=True)
+        
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        
+        self._import_json_files()
+    
+    def _execute(self, query, params=()):
+        with self._lock:
+            return self._conn.execute(query, params)
+    
+    def _transaction(self):
+        return _Transaction(self)
+    
+    def _import_json_files(self):
+        """One-time import of an existing JSON store into an empty database"""
+        guilds_file = os.path.join(self.data_dir, "guilds.json")
+        if not os.path.exists(guilds_file):
+            return
+        
+        if self._execute("SELECT 1 FROM guilds LIMIT 1").fetchone():
+            return
+        
+        def load(name, default):
+            try:
+                with open(os.path.join(self.data_dir, name), 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except:
+                return default
+        
+        guilds = load("guilds.json", {})
+        tickets = load("tickets.json", {})
+        logs = load("logs.json", {})
+        
+        with self._transaction() as conn:
+            for user_id in guilds.pop('blacklist', []):
+                conn.execute("INSERT OR IGNORE INTO blacklist (user_id) VALUES (?)", (user_id,))
+            
+            for guild_id, guild_data in guilds.items():
+                guild_data = dict(guild_data)
+                counter = guild_data.pop('ticket_counter', 0)
+                conn.execute(
+                    "INSERT INTO guilds (guild_id, config, ticket_counter) VALUES (?, ?, ?)",
+                    (int(guild_id), json.dumps(guild_data), counter)
+                )
+            
+            for guild_id, guild_tickets in tickets.items():
+                for channel_id, ticket in guild_tickets.items():
+                    conn.execute(
+                        "INSERT OR REPLACE INTO tickets (guild_id, channel_id, user_id, closed, data) VALUES (?, ?, ?, ?, ?)",
+                        (int(guild_id), int(channel_id), ticket.get('user_id'), int(bool(ticket.get('closed'))), json.dumps(ticket))
+                    )
+            
+            for guild_id, guild_logs in logs.items():
+                for ticket in guild_logs:
+                    conn.execute(
+                        "INSERT INTO archived_tickets (guild_id, channel_id, closed_at, data) VALUES (?, ?, ?, ?)",
+                        (int(guild_id), int(ticket.get('channel_id', 0)), ticket.get('closed_at', ''), json.dumps(ticket))
+                    )
+        
+        print(f"Imported {len(guilds)} guilds from {self.data_dir} into {self.path}")
+    
+    def flush(self):
+        pass
+    
+    def close(self):
+        with self._lock:
+            self._conn.close()
+    
+    # Guild Panel Management
+    def _get_guild_row(self, guild_id):
+        return self._execute(
+            "SELECT config, ticket_counter FROM guilds WHERE guild_id = ?",
+            (int(guild_id),)
+        ).fetchone()
+    
+    def _update_guild_config(self, guild_id, updates):
+        with self._transaction() as conn:
+            row = conn.execute("SELECT config FROM guilds WHERE guild_id = ?", (int(guild_id),)).fetchone()
+            config = json.loads(row['config']) if row else {}
+            config.update(updates)
+            conn.execute(
+                "INSERT INTO guilds (guild_id, config) VALUES (?, ?) "
+                "ON CONFLICT (guild_id) DO UPDATE SET config = excluded.config",
+                (int(guild_id), json.dumps(config))
+            )
+    
+    def set_guild_panel(self, guild_id, panel_config):
+        self._update_guild_config(guild_id, panel_config)
+    
+    def get_guild_panel(self, guild_id):
+        row = self._get_guild_row(guild_id)
+        if not row:
+            return None
+        
+        config = json.loads(row['config'])
+        config['ticket_counter'] = row['ticket_counter']
+        return config
+    
+    def get_guild_panels(self):
+        """Return every guild that has a deployed ticket panel"""
+        rows = self._execute("SELECT guild_id, config FROM guilds").fetchall()
+        panels = {}
+        for row in rows:
+            config = json.loads(row['config'])
+            if 'categories' in config:
+                panels[str(row['guild_id'])] = config
+        return panels
+    
+    def get_guild_prefix(self, guild_id):
+        row = self._get_guild_row(guild_id)
+        return json.loads(row['config']).get('prefix') if row else None
+    
+    def set_guild_prefix(self, guild_id, prefix):
+        self._update_guild_config(guild_id, {'prefix': prefix})
+    
+    def increment_ticket_counter(self, guild_id):
+        return self.reserve_ticket_numbers(guild_id, 1)
+    
+    def reserve_ticket_numbers(self, guild_id, count):
+        """Advance the counter by `count` and return the first number of the block"""
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO guilds (guild_id, ticket_counter) VALUES (?, ?) "
+                "ON CONFLICT (guild_id) DO UPDATE SET ticket_counter = ticket_counter + excluded.ticket_counter",
+                (int(guild_id), count)
+            )
+            row = conn.execute("SELECT ticket_counter FROM guilds WHERE guild_id = ?", (int(guild_id),)).fetchone()
+            return row['ticket_counter'] - count + 1
+    
+    def set_ticket_logs_channel(self, guild_id, channel_id):
+        self._update_guild_config(guild_id, {'logs_channel_id': channel_id})
+    
+    def get_ticket_logs_channel(self, guild_id):
+        row = self._get_guild_row(guild_id)
+        return json.loads(row['config']).get('logs_channel_id') if row else None
+    
+    # Ticket Management
+    def create_ticket(self, guild_id, channel_id, ticket_data):
+        ticket_data['created_at'] = datetime.utcnow().isoformat()
+        ticket_data['closed'] = False
+        
+        self._execute(
+            "INSERT OR REPLACE INTO tickets (guild_id, channel_id, user_id, closed, data) VALUES (?, ?, ?, 0, ?)",
+            (int(guild_id), int(channel_id), ticket_data.get('user_id'), json.dumps(ticket_data))
+        )
+    
+    def get_ticket(self, guild_id, channel_id):
+        row = self._execute(
+            "SELECT data FROM tickets WHERE guild_id = ? AND channel_id = ?",
+            (int(guild_id), int(channel_id))
+        ).fetchone()
+        return json.loads(row['data']) if row else None
+    
+    def get_guild_tickets(self, guild_id):
+        rows = self._execute(
+            "SELECT channel_id, data FROM tickets WHERE guild_id = ?",
+            (int(guild_id),)
+        ).fetchall()
+        return {str(row['channel_id']): json.loads(row['data']) for row in rows}
+    
+    def get_open_ticket_for_user(self, guild_id, user_id):
+        """Return the channel id of the user's open ticket in this guild, if any"""
+        row = self._execute(
+            "SELECT channel_id FROM tickets WHERE guild_id = ? AND user_id = ? AND closed = 0 LIMIT 1",
+            (int(guild_id), user_id)
+        ).fetchone()
+        return row['channel_id'] if row else None
+    
+    def get_open_tickets(self):
+        """Return {guild_id: {channel_id: ticket}} for every open ticket"""
+        rows = self._execute("SELECT guild_id, channel_id, data FROM tickets WHERE closed = 0").fetchall()
+        open_tickets = {}
+        for row in rows:
+            open_tickets.setdefault(str(row['guild_id']), {})[str(row['channel_id'])] = json.loads(row['data'])
+        return open_tickets
+    
+    def update_ticket(self, guild_id, channel_id, **updates):
+        # json_set replaces each updated key in place (nested dicts included),
+        # so a claim or priority change is a single-row UPDATE
+        query = "UPDATE tickets SET data = json_set(data" + ", ?, json(?)" * len(updates) + ")"
+        params = []
+        for key, value in updates.items():
+            params.extend([f'$."{key}"', json.dumps(value)])
+        
+        if 'closed' in updates:
+            query += ", closed = ?"
+            params.append(int(bool(updates['closed'])))
+        
+        query += " WHERE guild_id = ? AND channel_id = ?"
+        params.extend([int(guild_id), int(channel_id)])
+        
+        self._execute(query, params)
+    
+    def delete_ticket(self, guild_id, channel_id, closed_by=None, archive=True):
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT data FROM tickets WHERE guild_id = ? AND channel_id = ?",
+                (int(guild_id), int(channel_id))
+            ).fetchone()
+            
+            if row:
+                if archive:
+                    # Archive ticket before deleting
+                    self.archive_ticket(guild_id, channel_id, json.loads(row['data']), closed_by)
+                conn.execute(
+                    "DELETE FROM tickets WHERE guild_id = ? AND channel_id = ?",
+                    (int(guild_id), int(channel_id))
+                )
+    
+    def archive_ticket(self, guild_id, channel_id, ticket_data, closed_by=None):
+        ticket_data['closed_at'] = datetime.utcnow().isoformat()
+        ticket_data['channel_id'] = str(channel_id)
+        ticket_data['closed_by'] = closed_by
+        
+        self._execute(
+            "INSERT INTO archived_tickets (guild_id, channel_id, closed_at, data) VALUES (?, ?, ?, ?)",
+            (int(guild_id), int(channel_id), ticket_data['closed_at'], json.dumps(ticket_data))
+        )
+    
+    def query_archived_tickets(self, guild_id, limit=50, before=None, since=None, until=None, category=None, closed_by=None):
+        """Return (tickets, cursor) newest first; pass cursor as `before` for the next page"""
+        query = "SELECT id, data FROM archived_tickets WHERE guild_id = ?"
+        params = [int(guild_id)]
+        
+        if before:
+            query += " AND id < ?"
+            params.append(int(before))
+        if since:
+            query += " AND closed_at >= ?"
+            params.append(since.isoformat() if isinstance(since, datetime) else since)
+        if until:
+            query += " AND closed_at <= ?"
+            params.append(until.isoformat() if isinstance(until, datetime) else until)
+        if category is not None:
+            query += " AND json_extract(data, '$.category') = ?"
+            params.append(category)
+        if closed_by is not None:
+            query += " AND json_extract(data, '$.closed_by') = ?"
+            params.append(closed_by)
+        
+        query += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+        
+        rows = self._execute(query, params).fetchall()
+        cursor = str(rows[-1]['id']) if len(rows) == limit else None
+        return [json.loads(row['data']) for row in rows], cursor
+    
+    def get_archived_tickets(self, guild_id, limit=50):
+        tickets, _ = self.query_archived_tickets(guild_id, limit)
+        return tickets[::-1]
+    
+    # Blacklist
+    def get_blacklist(self):
+        return [row['user_id'] for row in self._execute("SELECT user_id FROM blacklist").fetchall()]
+    
+    def add_to_blacklist(self, user_id):
+        cursor = self._execute("INSERT OR IGNORE INTO blacklist (user_id) VALUES (?)", (user_id,))
+        return cursor.rowcount > 0
+    
+    def remove_from_blacklist(self, user_id):
+        cursor = self._execute("DELETE FROM blacklist WHERE user_id = ?", (user_id,))
+        return cursor.rowcount > 0
+    
+    # Statistics
+    def get_guild_stats(self, guild_id):
+        active_tickets = self._execute(
+            "SELECT COUNT(*) FROM tickets WHERE guild_id = ?", (int(guild_id),)
+        ).fetchone()[0]
+        closed_tickets = self._execute(
+            "SELECT COUNT(*) FROM archived_tickets WHERE guild_id = ?", (int(guild_id),)
+        ).fetchone()[0]
+        
+        return {
+            'active_tickets': active_tickets,
+            'closed_tickets': closed_tickets,
+            'total_tickets': active_tickets + closed_tickets
+        }
+    
+    # Cleanup
+    def delete_guild_data(self, guild_id):
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM guilds WHERE guild_id = ?", (int(guild_id),))
+            conn.execute("DELETE FROM tickets WHERE guild_id = ?", (int(guild_id),))
+        
+        # Keep logs for record keeping
+
+class _Transaction:
+    """Hold the connection lock for the duration of a BEGIN/COMMIT block"""
+    
+    def __init__(self, db):
+        self.db = db
+    
+    def __enter__(self):
+        self.db._lock.acquire()
+        self.db._conn.execute("BEGIN IMMEDIATE")
+        return self.db._conn
+    
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self.db._conn.execute("COMMIT")
+            else:
+                self.db._conn.execute("ROLLBACK")
+        finally:
+            self.db._lock.release()
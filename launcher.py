@@ -0,0 +1,188 @@
+"""Run the bot as several processes ("clusters"), each connecting its own range of shards.
+
+    python launcher.py --clusters 4
+    python launcher.py --clusters 4 --shards 32
+
+Every cluster is a normal Sadaf.py process told its shards through the
+environment (see the sharding settings in config.py). They share the SQLite
+database, and the launcher relays stats and events between them over a
+local socket so `stats`/`botinfo` show totals for the whole bot.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import signal
+import sys
+import aiohttp
+from config import TOKEN, DATABASE_BACKEND, CLUSTER_IPC_HOST, CLUSTER_IPC_PORT
+from utils.cluster import encode
+
+BOT_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Sadaf.py")
+# Seconds to wait before restarting a cluster that crashed
+RESTART_DELAY = 10
+# Discord allows one identify per 5 seconds per shard bucket
+IDENTIFY_DELAY = 5
+
+async def recommended_shards():
+    """The shard count Discord recommends for this bot"""
+    async with aiohttp.ClientSession() as session:
+        async with session.get(
+            "https://discord.com/api/v10/gateway/bot", headers={'Authorization': f"Bot {TOKEN}"}
+        ) as response:
+            response.raise_for_status()
+            return (await response.json())['shards']
+
+def shard_ranges(shard_count, cluster_count):
+    """Split shards 0..shard_count-1 into contiguous ranges, one per cluster"""
+    per_cluster = math.ceil(shard_count / cluster_count)
+    return [
+        list(range(start, min(start + per_cluster, shard_count)))
+        for start in range(0, shard_count, per_cluster)
+    ]
+
+class Launcher:
+    def __init__(self, shard_count, clusters):
+        self.shard_count = shard_count
+        self.clusters = clusters
+        # cluster_id -> stream writer of its connection
+        self.connections = {}
+        # cluster_id -> last stats it reported
+        self.stats = {}
+        self.ready = {cluster_id: asyncio.Event() for cluster_id in range(len(clusters))}
+        self.processes = {}
+        self.stopping = False
+    
+    async def serve(self):
+        return await asyncio.start_server(self.handle_connection, CLUSTER_IPC_HOST, CLUSTER_IPC_PORT)
+    
+    async def broadcast(self, message, sender):
+        data = encode(message)
+        for cluster_id, writer in list(self.connections.items()):
+            if cluster_id == sender:
+                continue
+            try:
+                writer.write(data)
+                await writer.drain()
+            except (ConnectionError, OSError):
+                pass
+    
+    async def handle_connection(self, reader, writer):
+        cluster_id = None
+        try:
+            while line := await reader.readline():
+                message = json.loads(line)
+                cluster_id = message.get('cluster')
+                op = message.get('op')
+                
+                if op == 'hello':
+                    self.connections[cluster_id] = writer
+                    # Catch the new connection up on everyone else's stats
+                    for other_id, stats in self.stats.items():
+                        if other_id != cluster_id:
+                            writer.write(encode({'op': 'stats', 'cluster': other_id, 'stats': stats}))
+                    await writer.drain()
+                elif op == 'stats':
+                    self.stats[cluster_id] = message['stats']
+                elif op == 'ready':
+                    self.ready[cluster_id].set()
+                    print(f"Cluster {cluster_id} is ready")
+                    continue
+                
+                await self.broadcast(message, cluster_id)
+        except (ConnectionError, OSError, ValueError) as e:
+            print(f"Error reading from cluster {cluster_id}: {e}")
+        finally:
+            writer.close()
+            if cluster_id is not None and self.connections.get(cluster_id) is writer:
+                del self.connections[cluster_id]
+                self.stats.pop(cluster_id, None)
+                await self.broadcast({'op': 'gone', 'cluster': cluster_id}, cluster_id)
+    
+    def cluster_env(self, cluster_id):
+        env = dict(os.environ)
+        env.update({
+            'CLUSTER_ID': str(cluster_id),
+            'CLUSTER_COUNT': str(len(self.clusters)),
+            'SHARD_COUNT': str(self.shard_count),
+            'SHARD_IDS': ",".join(map(str, self.clusters[cluster_id]))
+        })
+        return env
+    
+    async def run_cluster(self, cluster_id):
+        """Run one cluster, restarting it whenever it exits with an error"""
+        shards = self.clusters[cluster_id]
+        while not self.stopping:
+            print(f"Starting cluster {cluster_id} with shards {shards[0]}-{shards[-1]}")
+            process = await asyncio.create_subprocess_exec(
+                sys.executable, BOT_SCRIPT, env=self.cluster_env(cluster_id)
+            )
+            self.processes[cluster_id] = process
+            code = await process.wait()
+            
+            if code == 0 or self.stopping:
+                print(f"Cluster {cluster_id} exited")
+                return
+            print(f"Cluster {cluster_id} exited with code {code}, restarting in {RESTART_DELAY}s")
+            await asyncio.sleep(RESTART_DELAY)
+    
+    async def run(self):
+        server = await self.serve()
+        tasks = []
+        try:
+            for cluster_id, shards in enumerate(self.clusters):
+                if self.stopping:
+                    break
+                tasks.append(asyncio.create_task(self.run_cluster(cluster_id)))
+                # Start clusters one at a time so their identifies don't collide
+                if cluster_id < len(self.clusters) - 1:
+                    try:
+                        await asyncio.wait_for(self.ready[cluster_id].wait(), IDENTIFY_DELAY * len(shards) + 60)
+                    except asyncio.TimeoutError:
+                        print(f"Cluster {cluster_id} isn't ready yet, starting the next one anyway")
+            await asyncio.gather(*tasks)
+        finally:
+            server.close()
+    
+    def stop(self):
+        self.stopping = True
+        for event in self.ready.values():
+            event.set()
+        for process in self.processes.values():
+            if process.returncode is None:
+                process.terminate()
+
+def prepare_database():
+    """Create the schema (and import any JSON data) once, before the clusters open it"""
+    from database import SQLiteDatabase
+    SQLiteDatabase().close()
+
+async def main():
+    parser = argparse.ArgumentParser(description="Run the ticket bot as several clustered processes")
+    parser.add_argument("--clusters", type=int, default=2, help="worker processes to run")
+    parser.add_argument("--shards", type=int, default=None, help="total shards (default: Discord's recommendation)")
+    args = parser.parse_args()
+    
+    if args.clusters > 1 and DATABASE_BACKEND != "sqlite":
+        # The JSON backends keep the whole store in memory and would overwrite each other's writes
+        sys.exit(f"Running {args.clusters} clusters needs DATABASE_BACKEND = \"sqlite\" in config.py")
+    
+    shard_count = args.shards or await recommended_shards()
+    clusters = shard_ranges(shard_count, min(args.clusters, shard_count))
+    print(f"Running {shard_count} shards in {len(clusters)} clusters")
+    
+    if DATABASE_BACKEND == "sqlite":
+        prepare_database()
+    
+    launcher = Launcher(shard_count, clusters)
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, launcher.stop)
+        except NotImplementedError:
+            pass
+    await launcher.run()
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,76 @@
+import os
+import tempfile
+import unittest
+from database import Database
+from database.journal import Journal
+
+class CrashTestCase(unittest.TestCase):
+    """Runs each test in an empty working directory"""
+    
+    def setUp(self):
+        self._cwd = os.getcwd()
+        self._dir = tempfile.TemporaryDirectory()
+        os.chdir(self._dir.name)
+    
+    def tearDown(self):
+        os.chdir(self._cwd)
+        self._dir.cleanup()
+    
+    def crash(self, db):
+        """Stop using `db` without compacting, as if the process died"""
+        if db._flush_timer is not None:
+            db._flush_timer.cancel()
+        db.journal.close()
+
+class TornJournalTest(CrashTestCase):
+    """A crash mid-append leaves a partial last line in the journal"""
+    
+    def test_replay_truncates_torn_tail(self):
+        with open("journal.log", 'w', encoding='utf-8') as f:
+            f.write('{"op": "update_guild", "guild_id": "1", "updates": {}}\n{"op": "update", "guild_')
+        
+        journal = Journal("journal.log")
+        self.assertEqual(len(list(journal.replay())), 1)
+        journal.append({'op': 'delete_guild', 'guild_id': "1"})
+        journal.sync()
+        journal.close()
+        
+        records = list(Journal("journal.log").replay())
+        self.assertEqual([record['op'] for record in records], ['update_guild', 'delete_guild'])
+    
+    def test_writes_after_torn_tail_survive_restart(self):
+        db = Database(write_delay=60)
+        db.set_guild_panel(1, {'categories': []})
+        db.flush()
+        self.crash(db)
+        
+        with open(db.journal_file, 'a', encoding='utf-8') as f:
+            f.write('{"op": "update", "guild_')
+        
+        db = Database(write_delay=60)
+        db.set_guild_panel(1, {'categories': [], 'thread_ticket': True})
+        db.create_ticket(1, 2, {'user_id': 3})
+        db.flush()
+        self.crash(db)
+        
+        db = Database(write_delay=60)
+        self.assertTrue(db.get_guild_panel(1)['thread_ticket'])
+        self.assertEqual(db.get_ticket(1, 2)['user_id'], 3)
+        db.close()
+
+class DeleteTicketTest(CrashTestCase):
+    def test_crash_after_delete_archives_once(self):
+        db = Database(write_delay=60)
+        db.create_ticket(1, 2, {'user_id': 3})
+        db.flush()
+        db.delete_ticket(1, 2, closed_by=3)
+        self.crash(db)
+        
+        db = Database(write_delay=60)
+        self.assertIsNone(db.get_ticket(1, 2))
+        db.delete_ticket(1, 2, closed_by=3)
+        self.assertEqual(db.archive.count("1"), 1)
+        db.close()
+
+if __name__ == '__main__':
+    unittest.main()
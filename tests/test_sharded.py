@@ -0,0 +1,24 @@
+import os
+import unittest
+from database import ShardedDatabase
+from tests.test_journal import CrashTestCase
+
+class EvictionTest(CrashTestCase):
+    def test_idle_dirty_guild_is_written_and_evicted(self):
+        db = ShardedDatabase(idle_timeout=60, write_delay=60)
+        db.create_ticket(1, 2, {'user_id': 3})
+        db.flush()
+        db._last_access["1"] -= 120
+        db.evict_idle_guilds()
+        
+        self.assertNotIn("1", db._shards)
+        self.assertTrue(os.path.exists(db._shard_path("1")))
+        self.crash(db)
+        
+        db = ShardedDatabase(idle_timeout=60, write_delay=60)
+        self.assertEqual(db.get_ticket(1, 2)['user_id'], 3)
+        self.assertEqual(db.get_open_ticket_for_user(1, 3), 2)
+        db.close()
+
+if __name__ == '__main__':
+    unittest.main()
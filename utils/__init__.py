@@ -1,4 +1,4 @@
 from .embeds import *
 from .views import *
 
-__all__ = ['create_preview_container', 'create_ticket_container', 'TicketDropdownView', 'TicketButtonView']
\ No newline at end of file
+__all__ = ['create_preview_container', 'create_ticket_container', 'TicketDropdownView', 'TicketButtonView', 'TicketCategorySelect', 'TicketCategoryButton']
\ No newline at end of file
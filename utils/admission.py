@@ -0,0 +1,129 @@
+import asyncio
+import time
+from collections import deque
+
+# Seconds between sweeps for guilds whose bucket has refilled
+PRUNE_INTERVAL = 60
+
+class _Bucket:
+    def __init__(self, burst):
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.waiters = deque()
+        self.drainer = None
+
+class AdmissionController:
+    """Per-guild token bucket with a bounded queue in front of it.
+    
+    Each guild can start `burst` ticket creations at once, then one every
+    1 / `rate` seconds. Requests over that wait in line, in order, up to
+    `max_queue` of them; past that `acquire` turns them away. A guild's
+    bucket is forgotten once it has refilled, since a new bucket starts
+    full anyway.
+    """
+    
+    def __init__(self, rate, burst, max_queue, update_interval):
+        self.rate = rate
+        self.burst = burst
+        self.max_queue = max_queue
+        self.update_interval = update_interval
+        self._buckets = {}
+        self._pruned = time.monotonic()
+    
+    def _refill(self, bucket):
+        now = time.monotonic()
+        bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated) * self.rate)
+        bucket.updated = now
+    
+    def _prune(self):
+        now = time.monotonic()
+        if now - self._pruned < PRUNE_INTERVAL:
+            return
+        self._pruned = now
+        
+        for guild_id, bucket in list(self._buckets.items()):
+            if bucket.waiters or bucket.drainer is not None:
+                continue
+            self._refill(bucket)
+            if bucket.tokens >= self.burst:
+                del self._buckets[guild_id]
+    
+    def release(self, guild_id):
+        """Give back the slot of an admitted request that never used it"""
+        bucket = self._buckets.get(guild_id)
+        if bucket is not None:
+            self._refill(bucket)
+            bucket.tokens = min(self.burst, bucket.tokens + 1)
+    
+    @property
+    def queued(self):
+        """Requests waiting in line across every guild"""
+        return sum(len(bucket.waiters) for bucket in self._buckets.values())
+    
+    async def acquire(self, guild_id, on_position=None):
+        """Wait for a slot; returns False if the guild's queue is full.
+        
+        While queued, `on_position(n)` is awaited with the 1-based place
+        in line whenever it has changed, at most every `update_interval`
+        seconds. If the caller is cancelled after being admitted here, the
+        slot is given back; past that it is up to the caller to `release` it.
+        """
+        self._prune()
+        bucket = self._buckets.get(guild_id)
+        if bucket is None:
+            bucket = self._buckets[guild_id] = _Bucket(self.burst)
+        
+        self._refill(bucket)
+        if not bucket.waiters and bucket.tokens >= 1:
+            bucket.tokens -= 1
+            return True
+        
+        if len(bucket.waiters) >= self.max_queue:
+            return False
+        
+        waiter = asyncio.get_running_loop().create_future()
+        bucket.waiters.append(waiter)
+        if bucket.drainer is None:
+            bucket.drainer = asyncio.create_task(self._drain(bucket))
+        
+        last_position = None
+        try:
+            while not waiter.done():
+                position = bucket.waiters.index(waiter) + 1
+                if on_position and position != last_position:
+                    last_position = position
+                    try:
+                        await on_position(position)
+                    except Exception as e:
+                        print(f"Error sending queue position: {e}")
+                
+                try:
+                    await asyncio.wait_for(asyncio.shield(waiter), self.update_interval)
+                except asyncio.TimeoutError:
+                    pass
+            return True
+        except BaseException:
+            if waiter.done():
+                # Admitted just as we were cancelled
+                self.release(guild_id)
+            raise
+        finally:
+            # Give up our place if we were cancelled while waiting
+            if not waiter.done():
+                waiter.cancel()
+                bucket.waiters.remove(waiter)
+    
+    async def _drain(self, bucket):
+        while bucket.waiters:
+            self._refill(bucket)
+            if bucket.tokens < 1:
+                await asyncio.sleep((1 - bucket.tokens) / self.rate)
+                continue
+            
+            waiter = bucket.waiters.popleft()
+            if waiter.done():
+                continue
+            bucket.tokens -= 1
+            waiter.set_result(True)
+        
+        bucket.drainer = None
@@ -0,0 +1,62 @@
+import discord
+from discord.ext import commands
+
+class Blacklisted(commands.CheckFailure):
+    pass
+
+class BlacklistCheck:
+    """Mixin for views, modals and dynamic items that blacklisted users can't use.
+    
+    The command tree only checks slash commands; component and modal
+    interactions are checked here.
+    """
+    
+    async def interaction_check(self, interaction: discord.Interaction):
+        return await interaction.client.blacklist.check_interaction(interaction)
+
+class Blacklist:
+    """Blacklisted user ids, loaded once and checked on every command and panel click.
+    
+    Membership is answered from a set in memory; `add` and `remove` write
+    through to the database.
+    """
+    
+    def __init__(self, db):
+        self.db = db
+        self._user_ids = set()
+    
+    async def load(self):
+        self._user_ids = set(await self.db.get_blacklist())
+    
+    def __contains__(self, user_id):
+        return user_id in self._user_ids
+    
+    def __len__(self):
+        return len(self._user_ids)
+    
+    async def add(self, user_id):
+        added = await self.db.add_to_blacklist(user_id)
+        self._user_ids.add(user_id)
+        return added
+    
+    async def remove(self, user_id):
+        removed = await self.db.remove_from_blacklist(user_id)
+        self._user_ids.discard(user_id)
+        return removed
+    
+    def check_command(self, ctx):
+        """Global check for prefix commands"""
+        if ctx.author.id in self._user_ids:
+            raise Blacklisted()
+        return True
+    
+    async def check_interaction(self, interaction: discord.Interaction):
+        """Return False, after telling the user why, if they are blacklisted"""
+        if interaction.user.id not in self._user_ids:
+            return True
+        
+        from utils.embeds import create_error_embed
+        error_embed = create_error_embed("You are blacklisted from using this bot!", interaction.user)
+        if not interaction.response.is_done():
+            await interaction.response.send_message(embed=error_embed, ephemeral=True)
+        return False
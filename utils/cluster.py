@@ -0,0 +1,92 @@
+import asyncio
+import json
+
+RECONNECT_DELAY = 5
+
+def encode(message):
+    return (json.dumps(message) + "\n").encode('utf-8')
+
+class ClusterClient:
+    """One cluster's connection to the launcher, which relays messages between clusters.
+    
+    Messages are JSON lines. Every `interval` seconds this cluster sends
+    its stats snapshot; snapshots from the other clusters land in
+    `bot.stats.remote`. `publish` tells the other clusters about a change
+    to shared state (e.g. "blacklist") so they reload it from the database.
+    """
+    
+    def __init__(self, bot, cluster_id, host, port, interval):
+        self.bot = bot
+        self.cluster_id = cluster_id
+        self.host = host
+        self.port = port
+        self.interval = interval
+        self._writer = None
+        self._task = None
+    
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+    
+    async def close(self):
+        # Cancelling the task closes the connection
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+    
+    async def send(self, op, **data):
+        if self._writer is None:
+            return
+        try:
+            self._writer.write(encode(dict(data, op=op, cluster=self.cluster_id)))
+            await self._writer.drain()
+        except (ConnectionError, OSError) as e:
+            print(f"Error sending {op} to the launcher: {e}")
+    
+    async def publish(self, event):
+        await self.send('event', event=event)
+    
+    async def _run(self):
+        while True:
+            try:
+                reader, writer = await asyncio.open_connection(self.host, self.port)
+            except OSError as e:
+                print(f"Error connecting to the launcher at {self.host}:{self.port}: {e}")
+                await asyncio.sleep(RECONNECT_DELAY)
+                continue
+            
+            self._writer = writer
+            await self.send('hello')
+            reporter = asyncio.create_task(self._report())
+            try:
+                while line := await reader.readline():
+                    try:
+                        await self._handle(json.loads(line))
+                    except Exception as e:
+                        print(f"Error handling cluster message: {e}")
+            except (ConnectionError, OSError) as e:
+                print(f"Lost connection to the launcher: {e}")
+            finally:
+                reporter.cancel()
+                writer.close()
+                self._writer = None
+                self.bot.stats.remote.clear()
+            await asyncio.sleep(RECONNECT_DELAY)
+    
+    async def _report(self):
+        while True:
+            await self.send('stats', stats=self.bot.stats.snapshot())
+            await asyncio.sleep(self.interval)
+    
+    async def _handle(self, message):
+        op = message.get('op')
+        cluster_id = message.get('cluster')
+        
+        if op == 'stats':
+            self.bot.stats.remote[cluster_id] = message['stats']
+        elif op == 'hello':
+            # Let a cluster that just (re)connected see our numbers straight away
+            await self.send('stats', stats=self.bot.stats.snapshot())
+        elif op == 'gone':
+            self.bot.stats.remote.pop(cluster_id, None)
+        elif op == 'event' and message.get('event') == 'blacklist':
+            await self.bot.blacklist.load()
@@ -0,0 +1,168 @@
+import asyncio
+import functools
+import time
+
+# Histogram buckets in seconds, from a fast database read to a slow transcript
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+class Registry:
+    """Every metric the bot exposes, rendered in the Prometheus text format"""
+    
+    def __init__(self):
+        self.metrics = {}
+    
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+    
+    def render(self):
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+def escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{escape(value)}"' for key, value in labels) + "}"
+
+class Metric:
+    type = None
+    
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        # tuple of label values -> value
+        self.values = {}
+        registry.register(self)
+    
+    def _key(self, labels):
+        return tuple(str(labels[name]) for name in self.label_names)
+    
+    def _labels(self, key, **extra):
+        return list(zip(self.label_names, key)) + list(extra.items())
+
+class Counter(Metric):
+    type = "counter"
+    
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        self.values[key] = self.values.get(key, 0) + amount
+    
+    def samples(self):
+        return [f"{self.name}{format_labels(self._labels(key))} {value}" for key, value in self.values.items()]
+
+class Gauge(Metric):
+    type = "gauge"
+    
+    def __init__(self, name, help, labels=()):
+        super().__init__(name, help, labels)
+        self.function = None
+    
+    def set(self, value, **labels):
+        self.values[self._key(labels)] = value
+    
+    def set_function(self, function):
+        """Read the (unlabelled) value from `function` each time metrics are collected"""
+        self.function = function
+    
+    def samples(self):
+        if self.function is not None:
+            return [f"{self.name} {self.function()}"]
+        return [f"{self.name}{format_labels(self._labels(key))} {value}" for key, value in self.values.items()]
+
+class Histogram(Metric):
+    type = "histogram"
+    
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+    
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        series = self.values.get(key)
+        if series is None:
+            # per-bucket counts (non-cumulative), then sum and count
+            series = self.values[key] = [[0] * len(self.buckets), 0.0, 0]
+        
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[0][i] += 1
+                break
+        series[1] += value
+        series[2] += 1
+    
+    def time(self, **labels):
+        """Time a block (`with`) or every call of a function (decorator)"""
+        return _Timer(self, labels)
+    
+    def samples(self):
+        lines = []
+        for key, (counts, total, count) in self.values.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{format_labels(self._labels(key, le=bound))} {cumulative}")
+            lines.append(f"{self.name}_bucket{format_labels(self._labels(key, le='+Inf'))} {count}")
+            lines.append(f"{self.name}_sum{format_labels(self._labels(key))} {total}")
+            lines.append(f"{self.name}_count{format_labels(self._labels(key))} {count}")
+        return lines
+
+class _Timer:
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+    
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+    
+    def __call__(self, function):
+        if asyncio.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def wrapper(*args, **kwargs):
+                with _Timer(self.histogram, self.labels):
+                    return await function(*args, **kwargs)
+        else:
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                with _Timer(self.histogram, self.labels):
+                    return function(*args, **kwargs)
+        return wrapper
+
+# Ticket lifecycle
+TICKET_STAGE_SECONDS = Histogram(
+    "ticket_stage_seconds", "Time taken by each ticket action, from interaction to reply", ["stage"]
+)
+TICKET_ERRORS = Counter("ticket_errors_total", "Ticket actions that failed", ["stage"])
+TICKET_QUEUE_WAIT_SECONDS = Histogram("ticket_queue_wait_seconds", "Time ticket requests waited for admission")
+TICKET_QUEUE_LENGTH = Gauge("ticket_queue_length", "Ticket requests waiting for admission")
+TICKET_QUEUE_REJECTED = Counter("ticket_queue_rejected_total", "Ticket requests turned away because the queue was full")
+TRANSCRIPT_SECONDS = Histogram("transcript_seconds", "Time to render and package a transcript")
+
+# Storage
+DATABASE_CALL_SECONDS = Histogram(
+    "database_call_seconds", "Time for a database call, including waiting for the database thread", ["method"]
+)
+
+# Owner webhook logging
+WEBHOOK_EMBEDS = Counter("owner_webhook_embeds_total", "Owner log embeds by outcome", ["result"])
+WEBHOOK_SEND_SECONDS = Histogram("owner_webhook_send_seconds", "Time for one batched owner webhook request")
+
+# Bot
+GUILDS = Gauge("bot_guilds", "Guilds the bot is in")
+MEMBERS = Gauge("bot_members", "Members across all guilds")
+CLOSE_QUEUE_PENDING = Gauge("close_queue_pending", "Tickets waiting for or being closed")
+LOOP_LAG_SECONDS = Histogram("event_loop_lag_seconds", "How late the event loop woke a sleeping task")
+LOOP_STALLS = Counter("event_loop_stalls_total", "Times the event loop was blocked for longer than LOOP_STALL_THRESHOLD")
@@ -0,0 +1,30 @@
+class PrefixCache:
+    """guild id -> command prefix, read from the database once per guild.
+    
+    The prefix is looked up for every message the bot sees, so after the
+    first lookup a guild's prefix is answered from memory. `set` writes
+    through to the database and updates the cached value.
+    """
+    
+    def __init__(self, db, default):
+        self.db = db
+        self.default = default
+        self._prefixes = {}
+    
+    async def get(self, guild_id):
+        if guild_id is None:
+            return self.default
+        
+        prefix = self._prefixes.get(guild_id)
+        if prefix is None:
+            prefix = await self.db.get_guild_prefix(guild_id) or self.default
+            self._prefixes[guild_id] = prefix
+        
+        return prefix
+    
+    async def set(self, guild_id, prefix):
+        await self.db.set_guild_prefix(guild_id, prefix)
+        self._prefixes[guild_id] = prefix
+    
+    def forget(self, guild_id):
+        self._prefixes.pop(guild_id, None)
@@ -0,0 +1,136 @@
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+def frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+class SamplingProfiler:
+    """Samples one thread's stack from a background thread.
+    
+    Every `interval` seconds the target thread's current stack is recorded,
+    so the cost is the same however busy the event loop is. `dump` returns
+    the busiest functions followed by the stacks in collapsed format
+    ("outer;inner count"), which flamegraph tools read directly.
+    """
+    
+    def __init__(self, interval):
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self.started_at = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+    
+    @property
+    def running(self):
+        return self._thread is not None
+    
+    def start(self, thread_id):
+        self.stacks.clear()
+        self.samples = 0
+        self.started_at = time.time()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample, args=(thread_id,), name="profiler", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+    
+    def _sample(self, thread_id):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(thread_id)
+            if frame is None:
+                continue
+            
+            stack = []
+            while frame is not None:
+                stack.append(frame_label(frame))
+                frame = frame.f_back
+            with self._lock:
+                self.stacks[";".join(reversed(stack))] += 1
+                self.samples += 1
+    
+    def dump(self, top=40):
+        with self._lock:
+            stacks = Counter(self.stacks)
+            samples = self.samples
+        
+        own = Counter()
+        total = Counter()
+        for stack, count in stacks.items():
+            frames = stack.split(";")
+            own[frames[-1]] += count
+            for label in set(frames):
+                total[label] += count
+        
+        lines = [
+            f"{samples} samples every {self.interval * 1000:g}ms over {time.time() - self.started_at:.1f}s",
+            "",
+            f"{'own %':>7} {'total %':>8}  function"
+        ]
+        for label, count in own.most_common(top):
+            lines.append(f"{count / samples:>7.1%} {total[label] / samples:>8.1%}  {label}")
+        
+        lines += ["", "Collapsed stacks:"]
+        lines += [f"{stack} {count}" for stack, count in stacks.most_common()]
+        return "\n".join(lines) + "\n"
+
+class MemoryTracer:
+    """tracemalloc snapshots, each compared with the one before it"""
+    
+    def __init__(self, frames=10):
+        self.frames = frames
+        self.snapshot = None
+        self.taken_at = None
+    
+    @property
+    def running(self):
+        return tracemalloc.is_tracing()
+    
+    def start(self):
+        tracemalloc.start(self.frames)
+        self.snapshot = tracemalloc.take_snapshot()
+        self.taken_at = time.time()
+    
+    def stop(self):
+        tracemalloc.stop()
+        self.snapshot = None
+    
+    def diff(self, top=25):
+        """Take a snapshot and report what grew since the last one"""
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        current, peak = tracemalloc.get_traced_memory()
+        
+        lines = [
+            f"Traced memory: {current / 1024 / 1024:.1f} MB (peak {peak / 1024 / 1024:.1f} MB)",
+            f"Compared with the snapshot from {time.time() - self.taken_at:.0f}s ago",
+            "",
+            f"Top {top} changes by allocation site:"
+        ]
+        for stat in snapshot.compare_to(self.snapshot, 'lineno')[:top]:
+            lines.append(f"{stat.size_diff / 1024:+10.1f} KiB {stat.count_diff:+8} blocks  {stat.traceback}")
+        
+        lines += ["", f"Top {top} allocation sites now:"]
+        for stat in snapshot.statistics('lineno')[:top]:
+            lines.append(f"{stat.size / 1024:10.1f} KiB {stat.count:8} blocks  {stat.traceback}")
+        
+        lines += ["", "Largest allocation site, full traceback:"]
+        biggest = snapshot.statistics('traceback')[:1]
+        for stat in biggest:
+            lines += stat.traceback.format()
+        
+        self.snapshot = snapshot
+        self.taken_at = time.time()
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,72 @@
+class RoleMemberCache:
+    """role id -> member ids, built once per guild and kept current from member events.
+    
+    `role.members` scans every cached member of the guild on each call;
+    this pays that cost once per guild and then answers from a set.
+    A snapshot taken before the guild's members finished chunking is
+    provisional and is rebuilt once `guild.chunked` is True.
+    """
+    
+    def __init__(self):
+        # guild_id -> {role_id: set(member_id)}
+        self._guilds = {}
+        # Guilds whose snapshot was built from a partial member list
+        self._provisional = set()
+    
+    def _roles(self, guild):
+        roles = self._guilds.get(guild.id)
+        
+        if roles is None or (guild.id in self._provisional and guild.chunked):
+            roles = {}
+            for member in guild.members:
+                for role in member.roles:
+                    roles.setdefault(role.id, set()).add(member.id)
+            self._guilds[guild.id] = roles
+            
+            if guild.chunked:
+                self._provisional.discard(guild.id)
+            else:
+                self._provisional.add(guild.id)
+        
+        return roles
+    
+    def members(self, guild, role_ids):
+        """Return the ids of members holding any of `role_ids`"""
+        roles = self._roles(guild)
+        
+        member_ids = set()
+        for role_id in role_ids:
+            member_ids |= roles.get(role_id, set())
+        return member_ids
+    
+    def add_member(self, member):
+        roles = self._guilds.get(member.guild.id)
+        if roles is None:
+            return
+        
+        for role in member.roles:
+            roles.setdefault(role.id, set()).add(member.id)
+    
+    def update_member(self, before, after):
+        roles = self._guilds.get(after.guild.id)
+        if roles is None:
+            return
+        
+        before_roles = {role.id for role in before.roles}
+        after_roles = {role.id for role in after.roles}
+        
+        for role_id in before_roles - after_roles:
+            roles.get(role_id, set()).discard(after.id)
+        for role_id in after_roles - before_roles:
+            roles.setdefault(role_id, set()).add(after.id)
+    
+    def remove_member(self, guild_id, member_id):
+        for member_ids in self._guilds.get(guild_id, {}).values():
+            member_ids.discard(member_id)
+    
+    def remove_role(self, guild_id, role_id):
+        self._guilds.get(guild_id, {}).pop(role_id, None)
+    
+    def drop_guild(self, guild_id):
+        self._guilds.pop(guild_id, None)
+        self._provisional.discard(guild_id)
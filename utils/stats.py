@@ -0,0 +1,93 @@
+import discord
+
+FIELDS = ('members', 'channels', 'text_channels', 'voice_channels', 'roles', 'emojis')
+
+class BotStats:
+    """Bot-wide totals kept up to date from gateway events.
+    
+    Each guild's counts are stored when it becomes available and adjusted
+    as members, channels, roles and emojis change, so reading a total
+    never walks the guild list. The command count is cached until a
+    command is added or removed.
+    
+    When the bot runs as several clusters, `remote` holds the latest
+    snapshot reported by each other cluster and `merged` adds them up.
+    """
+    
+    def __init__(self):
+        self.totals = dict.fromkeys(FIELDS, 0)
+        self.open_tickets = 0
+        # guild_id -> that guild's share of the totals
+        self._guilds = {}
+        self._command_count = None
+        # cluster_id -> snapshot from that cluster
+        self.remote = {}
+    
+    @property
+    def guilds(self):
+        return len(self._guilds)
+    
+    def _count(self, guild):
+        return {
+            'members': guild.member_count or 0,
+            # Every channel type, categories and forums included
+            'channels': len(guild.channels),
+            'text_channels': len(guild.text_channels),
+            'voice_channels': len(guild.voice_channels),
+            'roles': len(guild.roles),
+            'emojis': len(guild.emojis)
+        }
+    
+    def add_guild(self, guild):
+        """Count a guild that joined or became available; recounts it if already known"""
+        self.remove_guild(guild.id)
+        counts = self._count(guild)
+        self._guilds[guild.id] = counts
+        for field, value in counts.items():
+            self.totals[field] += value
+    
+    def remove_guild(self, guild_id):
+        counts = self._guilds.pop(guild_id, None)
+        if counts:
+            for field, value in counts.items():
+                self.totals[field] -= value
+    
+    def adjust(self, guild_id, field, delta):
+        counts = self._guilds.get(guild_id)
+        if counts is not None:
+            counts[field] += delta
+            self.totals[field] += delta
+    
+    def set(self, guild_id, field, value):
+        counts = self._guilds.get(guild_id)
+        if counts is not None:
+            self.adjust(guild_id, field, value - counts[field])
+    
+    def channel_changed(self, channel, delta):
+        self.adjust(channel.guild.id, 'channels', delta)
+        if isinstance(channel, discord.TextChannel):
+            self.adjust(channel.guild.id, 'text_channels', delta)
+        elif isinstance(channel, discord.VoiceChannel):
+            self.adjust(channel.guild.id, 'voice_channels', delta)
+    
+    def command_count(self, bot):
+        if self._command_count is None:
+            self._command_count = sum(1 for _ in bot.walk_commands())
+        return self._command_count
+    
+    def commands_changed(self):
+        self._command_count = None
+    
+    def tickets_changed(self, delta):
+        self.open_tickets += delta
+    
+    def snapshot(self):
+        return dict(self.totals, guilds=self.guilds, open_tickets=self.open_tickets)
+    
+    def merged(self):
+        """This cluster's snapshot plus every other cluster's last report"""
+        merged = self.snapshot()
+        for snapshot in self.remote.values():
+            for key in merged:
+                merged[key] += snapshot.get(key, 0)
+        return merged
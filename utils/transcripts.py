@@ -0,0 +1,319 @@
+import gzip
+import html
+import io
+import json
+import os
+import tempfile
+import threading
+import zipfile
+from collections import OrderedDict
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+TRANSCRIPTS_DIR = os.path.join("data", "transcripts")
+TIMEZONE = ZoneInfo("Asia/Dhaka")
+# Log files kept open between flushes; the least recently written are closed first
+MAX_OPEN_FILES = 256
+
+class TranscriptLog:
+    """Per-ticket JSON Lines log of messages, appended as they are sent.
+    
+    `append` only queues the record in memory, so the event loop never
+    touches the disk for a message. `flush`, run in a worker thread,
+    writes the queue through file handles that stay open between flushes.
+    `delete` also touches the disk and belongs in a worker thread.
+    """
+    
+    def __init__(self, root=TRANSCRIPTS_DIR, max_open=MAX_OPEN_FILES):
+        self.root = root
+        self.max_open = max_open
+        os.makedirs(root, exist_ok=True)
+        # channel_id -> serialized records waiting for flush
+        self._pending = {}
+        self._files = OrderedDict()
+        # channel_id -> id of the newest message logged
+        self._last_ids = {}
+        # Channels with a log that hasn't been deleted
+        self._live = self.channel_ids()
+        # Guards _pending and _live, taken on the event loop; _io_lock guards _files
+        self._lock = threading.Lock()
+        self._io_lock = threading.Lock()
+    
+    def path(self, channel_id):
+        return os.path.join(self.root, f"{channel_id}.jsonl")
+    
+    def channel_ids(self):
+        """Channels that currently have a log"""
+        channel_ids = set()
+        for filename in os.listdir(self.root):
+            name, ext = os.path.splitext(filename)
+            if ext == '.jsonl' and name.isdigit():
+                channel_ids.add(int(name))
+        return channel_ids
+    
+    def create(self, channel_id):
+        """Start an empty log; the file is created by the next flush"""
+        with self._lock:
+            self._pending.setdefault(channel_id, [])
+            self._live.add(channel_id)
+        self._last_ids[channel_id] = None
+    
+    def append(self, channel_id, record):
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._pending.setdefault(channel_id, []).append(line)
+        if record['type'] == 'message' and (self._last_ids.get(channel_id) or 0) < record['id']:
+            self._last_ids[channel_id] = record['id']
+    
+    def _file(self, channel_id):
+        f = self._files.get(channel_id)
+        if f is not None:
+            self._files.move_to_end(channel_id)
+            return f
+        
+        if len(self._files) >= self.max_open:
+            _, oldest = self._files.popitem(last=False)
+            oldest.close()
+        f = self._files[channel_id] = open(self.path(channel_id), 'a', encoding='utf-8')
+        return f
+    
+    def flush(self, channel_id=None):
+        """Write queued records, for one channel or all of them"""
+        with self._lock:
+            if channel_id is None:
+                pending, self._pending = self._pending, {}
+            else:
+                pending = {channel_id: self._pending.pop(channel_id, [])}
+        
+        with self._io_lock:
+            for channel_id, lines in pending.items():
+                # Deleted after its lines were taken; don't bring the file back
+                if channel_id not in self._live:
+                    continue
+                f = self._file(channel_id)
+                f.write("".join(lines))
+                f.flush()
+    
+    def last_message_id(self, channel_id):
+        """Id of the newest message in the log, or None if it has none"""
+        if channel_id not in self._last_ids:
+            messages = self.read(channel_id)
+            self._last_ids[channel_id] = messages[-1]['id'] if messages else None
+        return self._last_ids[channel_id]
+    
+    def read(self, channel_id):
+        """Return the channel's messages in order with edits and deletions applied"""
+        self.flush(channel_id)
+        messages = {}
+        
+        with open(self.path(channel_id), 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                
+                if record['type'] == 'message':
+                    messages[record['id']] = record
+                elif record['id'] in messages:
+                    message = messages[record['id']]
+                    if record['type'] == 'edit':
+                        message.update(content=record['content'], embeds=record['embeds'], edited_at=record['edited_at'])
+                    elif record['type'] == 'delete':
+                        message['deleted'] = True
+        
+        # Backfilled messages can be logged after newer live ones
+        return sorted(messages.values(), key=lambda message: message['id'])
+    
+    def delete(self, channel_id):
+        with self._lock:
+            self._pending.pop(channel_id, None)
+            self._live.discard(channel_id)
+        self._last_ids.pop(channel_id, None)
+        
+        with self._io_lock:
+            f = self._files.pop(channel_id, None)
+            if f is not None:
+                f.close()
+        try:
+            os.remove(self.path(channel_id))
+        except FileNotFoundError:
+            pass
+    
+    def close(self):
+        self.flush()
+        with self._io_lock:
+            for f in self._files.values():
+                f.close()
+            self._files.clear()
+
+def embed_record(embed):
+    return {
+        'title': embed.title,
+        'description': embed.description,
+        'fields': [[field.name, field.value] for field in embed.fields]
+    }
+
+def message_record(message):
+    return {
+        'type': 'message',
+        'id': message.id,
+        'author_id': message.author.id,
+        'author': str(message.author),
+        'avatar': message.author.display_avatar.url,
+        'bot': message.author.bot,
+        'content': message.content,
+        'created_at': message.created_at.isoformat(),
+        'embeds': [embed_record(embed) for embed in message.embeds],
+        'attachments': [attachment.url for attachment in message.attachments]
+    }
+
+def raw_edit_record(data):
+    """Edit record from a raw MESSAGE_UPDATE payload, which carries the whole message"""
+    return {
+        'type': 'edit',
+        'id': int(data['id']),
+        'content': data.get('content', ""),
+        'embeds': [
+            {
+                'title': embed.get('title'),
+                'description': embed.get('description'),
+                'fields': [[field['name'], field['value']] for field in embed.get('fields', [])]
+            }
+            for embed in data.get('embeds', [])
+        ],
+        'edited_at': data.get('edited_timestamp') or datetime.now(TIMEZONE).isoformat()
+    }
+
+def format_time(timestamp):
+    return datetime.fromisoformat(timestamp).astimezone(TIMEZONE).strftime("%Y-%m-%d %I:%M %p")
+
+def format_text(text):
+    return html.escape(text or "").replace("\n", "<br>")
+
+def render_message(message):
+    parts = []
+    
+    if message['content']:
+        parts.append(f'<div class="content">{format_text(message["content"])}</div>')
+    
+    for embed in message['embeds']:
+        fields = "".join(
+            f'<div class="field"><b>{format_text(name)}</b><br>{format_text(value)}</div>'
+            for name, value in embed['fields']
+        )
+        parts.append(
+            f'<div class="embed"><div class="embed-title">{format_text(embed["title"])}</div>'
+            f'<div>{format_text(embed["description"])}</div>{fields}</div>'
+        )
+    
+    for url in message['attachments']:
+        parts.append(f'<div class="attachment"><a href="{html.escape(url)}">{html.escape(url.split("?")[0].split("/")[-1])}</a></div>')
+    
+    notes = []
+    if message.get('edited_at'):
+        notes.append("(edited)")
+    if message.get('deleted'):
+        notes.append("(deleted)")
+    
+    bot_tag = ' <span class="bot">BOT</span>' if message['bot'] else ''
+    return (
+        f'<div class="message{" deleted" if message.get("deleted") else ""}">'
+        f'<img class="avatar" src="{html.escape(message["avatar"])}">'
+        f'<div><div class="header"><span class="author">{html.escape(message["author"])}</span>{bot_tag}'
+        f'<span class="time">{format_time(message["created_at"])} {" ".join(notes)}</span></div>'
+        f'{"".join(parts)}</div></div>'
+    )
+
+TEMPLATE_HEAD = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+body {{ background: #313338; color: #dbdee1; font-family: "gg sans", "Helvetica Neue", Helvetica, Arial, sans-serif; margin: 0; padding: 16px; }}
+h1 {{ font-size: 20px; color: #f2f3f5; }}
+.message {{ display: flex; gap: 12px; padding: 6px 0; }}
+.deleted {{ opacity: 0.5; }}
+.avatar {{ width: 40px; height: 40px; border-radius: 50%; }}
+.author {{ color: #f2f3f5; font-weight: 600; }}
+.bot {{ background: #5865f2; color: #fff; font-size: 10px; padding: 1px 4px; border-radius: 3px; }}
+.time {{ color: #949ba4; font-size: 12px; margin-left: 8px; }}
+.embed {{ border-left: 4px solid #5865f2; background: #2b2d31; padding: 8px 12px; margin-top: 4px; border-radius: 4px; max-width: 520px; }}
+.embed-title {{ font-weight: 600; color: #f2f3f5; }}
+.field {{ margin-top: 6px; }}
+a {{ color: #00a8fc; }}
+</style>
+</head>
+<body>
+<h1>{title}</h1>
+<p>{count} messages</p>
+"""
+
+TEMPLATE_FOOT = """</body>
+</html>
+"""
+
+def render_transcript(messages, channel_name, ticket_data):
+    """Yield the transcript HTML a piece at a time"""
+    ticket_num = ticket_data.get('ticket_number', 0)
+    title = html.escape(f"Ticket #{ticket_num:04d} - {channel_name}")
+    
+    yield TEMPLATE_HEAD.format(title=title, count=len(messages))
+    for message in messages:
+        yield render_message(message) + "\n"
+    yield TEMPLATE_FOOT
+
+def write_transcript(chunks, filename, compression=None):
+    """Stream text chunks into a temporary file, compressing them on the way.
+    
+    `compression` is None, "gzip" or "zip". Returns the file (rewound),
+    its final name and the uncompressed size in bytes.
+    """
+    out = tempfile.TemporaryFile()
+    size = 0
+    
+    if compression == "gzip":
+        target = gzip.GzipFile(filename=filename, mode='wb', fileobj=out)
+        filename += ".gz"
+    elif compression == "zip":
+        archive = zipfile.ZipFile(out, 'w', zipfile.ZIP_DEFLATED)
+        target = archive.open(filename, 'w', force_zip64=True)
+        filename = os.path.splitext(filename)[0] + ".zip"
+    else:
+        target = out
+    
+    for chunk in chunks:
+        data = chunk.encode('utf-8')
+        size += len(data)
+        target.write(data)
+    
+    if target is not out:
+        target.close()
+    if compression == "zip":
+        archive.close()
+    
+    out.seek(0)
+    return out, filename, size
+
+def split_file(fp, filename, part_size):
+    """Return [(filename, fp)] with no part larger than `part_size` bytes.
+    
+    Oversized files become filename.001, filename.002, ... which can be
+    joined back together with `cat`.
+    """
+    total = fp.seek(0, os.SEEK_END)
+    fp.seek(0)
+    
+    if total <= part_size:
+        return [(filename, fp)]
+    
+    parts = []
+    while True:
+        data = fp.read(part_size)
+        if not data:
+            break
+        parts.append((f"{filename}.{len(parts) + 1:03d}", io.BytesIO(data)))
+    
+    fp.close()
+    return parts
@@ -1,9 +1,10 @@
 import discord
 from discord import ui
 from discord.ext import commands
+from utils.blacklist import BlacklistCheck
 from config import EMOJIS
 
-class TicketModal(ui.Modal, title="Create Ticket"):
+class TicketModal(BlacklistCheck, ui.Modal, title="Create Ticket"):
     subject = ui.TextInput(
         label="Subject",
         placeholder="Brief description of your issue",
@@ -57,12 +58,27 @@ class TicketModal(ui.Modal, title="Create Ticket"):
         if cog:
             await cog.handle_ticket_creation(interaction, ticket_data)
 
-class TicketDropdownView(ui.View):
+BUTTON_STYLES = {
+    'red': discord.ButtonStyle.red,
+    'green': discord.ButtonStyle.green,
+    'blue': discord.ButtonStyle.blurple,
+    'grey': discord.ButtonStyle.grey,
+    'blurple': discord.ButtonStyle.blurple
+}
+
+async def get_panel_categories(interaction: discord.Interaction):
+    panel_data = await interaction.client.db.get_guild_panel(interaction.guild.id) or {}
+    return panel_data.get('categories', [])
+
+async def send_category_not_found(interaction: discord.Interaction):
+    from utils.embeds import create_error_embed
+    error_embed = create_error_embed("Category not found!", interaction.user)
+    await interaction.response.send_message(embed=error_embed, ephemeral=True)
+
+class TicketCategorySelect(BlacklistCheck, ui.DynamicItem[ui.Select], template=r'ticket_category_select_persistent'):
+    """Panel dropdown; the guild's categories are looked up when it is used"""
+    
     def __init__(self, bot, categories):
-        super().__init__(timeout=None)
-        self.bot = bot
-        self.categories = categories
-        
         select = ui.Select(
             placeholder="Select a category to create a ticket",
             custom_id="ticket_category_select_persistent"
@@ -75,10 +91,15 @@ class TicketDropdownView(ui.View):
                 emoji=category.get('emoji')
             )
         
-        select.callback = self.dropdown_callback
-        self.add_item(select)
+        super().__init__(select)
+        self.bot = bot
+        self.categories = categories
     
-    async def dropdown_callback(self, interaction: discord.Interaction):
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: ui.Select, match):
+        return cls(interaction.client, await get_panel_categories(interaction))
+    
+    async def callback(self, interaction: discord.Interaction):
         category_name = interaction.data['values'][0]
         
         category_data = None
@@ -88,40 +109,47 @@ class TicketDropdownView(ui.View):
                 break
         
         if not category_data:
-            from utils.embeds import create_error_embed
-            error_embed = create_error_embed("Category not found!", interaction.user)
-            return await interaction.response.send_message(embed=error_embed, ephemeral=True)
+            return await send_category_not_found(interaction)
         
         modal = TicketModal(self.bot, category_data)
         await interaction.response.send_modal(modal)
 
-class TicketButtonView(ui.View):
-    def __init__(self, bot, categories):
-        super().__init__(timeout=None)
+class TicketCategoryButton(BlacklistCheck, ui.DynamicItem[ui.Button], template=r'ticket_button_persistent_(?P<index>\d+)'):
+    """Panel button for the category at `index` in the guild's panel"""
+    
+    def __init__(self, bot, category_data, index):
+        category = category_data or {}
+        super().__init__(ui.Button(
+            label=category.get('name'),
+            style=BUTTON_STYLES.get(category.get('color', 'blurple'), discord.ButtonStyle.blurple),
+            emoji=category.get('emoji'),
+            custom_id=f"ticket_button_persistent_{index}",
+            row=index // 5
+        ))
         self.bot = bot
-        self.categories = categories
-        
-        color_map = {
-            'red': discord.ButtonStyle.red,
-            'green': discord.ButtonStyle.green,
-            'blue': discord.ButtonStyle.blurple,
-            'grey': discord.ButtonStyle.grey,
-            'blurple': discord.ButtonStyle.blurple
-        }
+        self.category_data = category_data
+    
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: ui.Button, match):
+        categories = await get_panel_categories(interaction)
+        index = int(match['index'])
+        category_data = categories[index] if index < len(categories) else None
+        return cls(interaction.client, category_data, index)
+    
+    async def callback(self, interaction: discord.Interaction):
+        if not self.category_data:
+            return await send_category_not_found(interaction)
         
+        modal = TicketModal(self.bot, self.category_data)
+        await interaction.response.send_modal(modal)
+
+class TicketDropdownView(BlacklistCheck, ui.View):
+    def __init__(self, bot, categories):
+        super().__init__(timeout=None)
+        self.add_item(TicketCategorySelect(bot, categories))
+
+class TicketButtonView(BlacklistCheck, ui.View):
+    def __init__(self, bot, categories):
+        super().__init__(timeout=None)
         for i, category in enumerate(categories[:25]):
-            button = ui.Button(
-                label=category['name'],
-                style=color_map.get(category.get('color', 'blurple'), discord.ButtonStyle.blurple),
-                emoji=category.get('emoji'),
-                custom_id=f"ticket_button_persistent_{i}",
-                row=i // 5
-            )
-            button.callback = self.create_button_callback(category)
-            self.add_item(button)
-    
-    def create_button_callback(self, category_data):
-        async def callback(interaction: discord.Interaction):
-            modal = TicketModal(self.bot, category_data)
-            await interaction.response.send_modal(modal)
-        return callback
\ No newline at end of file
+            self.add_item(TicketCategoryButton(bot, category, i))
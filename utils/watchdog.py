@@ -0,0 +1,128 @@
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from utils.metrics import LOOP_LAG_SECONDS, LOOP_STALLS
+
+# Locals that tell us which guild/ticket a blocked coroutine was working on
+CONTEXT_OBJECTS = ('interaction', 'ctx', 'message')
+CONTEXT_IDS = ('guild_id', 'channel_id', 'user_id')
+
+def describe_context(frame):
+    """Guild, channel and user ids from the innermost frame that has any"""
+    while frame is not None:
+        local_vars = frame.f_locals
+        context = {}
+        for name in CONTEXT_OBJECTS:
+            obj = local_vars.get(name)
+            if obj is None:
+                continue
+            for attr in ('guild', 'channel'):
+                value = getattr(obj, attr, None)
+                if value is not None and f'{attr}_id' not in context:
+                    context[f'{attr}_id'] = getattr(value, 'id', None)
+            author = getattr(obj, 'user', None) or getattr(obj, 'author', None)
+            if author is not None and 'user_id' not in context:
+                context['user_id'] = getattr(author, 'id', None)
+        for name in CONTEXT_IDS:
+            if isinstance(local_vars.get(name), int) and name not in context:
+                context[name] = local_vars[name]
+        if context:
+            return context
+        frame = frame.f_back
+    return {}
+
+class LoopWatchdog:
+    """Measures how late the event loop runs a sleep that should take `interval`.
+    
+    A task on the loop records a heartbeat every `interval`; a thread checks
+    it and, once the loop has been stuck for longer than `threshold`, saves
+    the stack of whatever is blocking it. When the loop catches up the lag
+    is recorded as a stall together with that stack, the running task and
+    any guild/channel/user ids found in the blocked frames.
+    """
+    
+    def __init__(self, interval, threshold, window, history):
+        self.interval = interval
+        self.threshold = threshold
+        # recent lag samples, `window` seconds' worth
+        self.lags = deque(maxlen=max(1, int(window / interval)))
+        self.stalls = deque(maxlen=history)
+        self._beat = None
+        self._capture = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._task = None
+        self._thread = None
+    
+    def start(self):
+        loop = asyncio.get_running_loop()
+        self._beat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._measure())
+        self._thread = threading.Thread(
+            target=self._watch, args=(loop, threading.get_ident()), name="loop-watchdog", daemon=True
+        )
+        self._thread.start()
+    
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._thread is not None:
+            self._stop.set()
+            await asyncio.to_thread(self._thread.join)
+            self._thread = None
+    
+    async def _measure(self):
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - start - self.interval)
+            
+            with self._lock:
+                self._beat = now
+                capture, self._capture = self._capture, None
+            
+            self.lags.append(lag)
+            LOOP_LAG_SECONDS.observe(lag)
+            if lag >= self.threshold:
+                self._record(lag, capture)
+    
+    def _watch(self, loop, thread_id):
+        while not self._stop.wait(self.interval / 2):
+            with self._lock:
+                stuck = time.monotonic() - self._beat - self.interval
+                if stuck < self.threshold or self._capture is not None:
+                    continue
+                frame = sys._current_frames().get(thread_id)
+                if frame is None:
+                    continue
+                task = asyncio.current_task(loop)
+                self._capture = {
+                    'stack': "".join(traceback.format_stack(frame)),
+                    'task': task.get_name() if task else None,
+                    'coro': getattr(task.get_coro(), '__qualname__', None) if task else None,
+                    'context': describe_context(frame)
+                }
+    
+    def _record(self, lag, capture):
+        capture = capture or {'stack': None, 'task': None, 'coro': None, 'context': {}}
+        stall = dict(capture, lag=lag, time=time.time())
+        self.stalls.append(stall)
+        LOOP_STALLS.inc()
+        
+        context = " ".join(f"{key}={value}" for key, value in stall['context'].items())
+        print(f"Event loop blocked for {lag * 1000:.0f}ms in {stall['coro'] or 'unknown'} {context}".rstrip())
+        if stall['stack']:
+            print(stall['stack'].rstrip())
+    
+    def percentile(self, q):
+        samples = sorted(self.lags)
+        return samples[min(len(samples) - 1, int(q * len(samples)))] if samples else 0.0
+    
+    def worst(self, count):
+        return sorted(self.stalls, key=lambda stall: stall['lag'], reverse=True)[:count]
@@ -0,0 +1,96 @@
+import discord
+import asyncio
+import aiohttp
+from collections import deque
+from utils.metrics import WEBHOOK_EMBEDS, WEBHOOK_SEND_SECONDS
+
+# Discord's limits for one webhook message
+MAX_EMBEDS = 10
+MAX_EMBED_CHARS = 6000
+
+class WebhookLogBuffer:
+    """Collects log embeds and posts them to a webhook up to ten at a time.
+    
+    A batch goes out once `MAX_EMBEDS` embeds are waiting or every
+    `flush_interval` seconds, whichever comes first. At most `max_pending`
+    embeds wait at once; anything over that is dropped and counted rather
+    than letting a slow or rate limited webhook back up the bot.
+    """
+    
+    def __init__(self, url, flush_interval, max_pending):
+        self.url = url
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.pending = deque()
+        self.sent = 0
+        self.dropped = 0
+        self.failed = 0
+        self._session = None
+        self._webhook = None
+        self._wakeup = asyncio.Event()
+        self._task = None
+    
+    def start(self):
+        self._session = aiohttp.ClientSession()
+        self._webhook = discord.Webhook.from_url(self.url, session=self._session)
+        self._task = asyncio.create_task(self._run())
+    
+    async def close(self):
+        """Send whatever is still waiting, then close the HTTP session"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        
+        if self._session is not None:
+            await self.flush()
+            await self._session.close()
+            self._session = None
+    
+    def put(self, embed):
+        """Queue an embed; returns False if it was dropped"""
+        if len(self.pending) >= self.max_pending:
+            self.dropped += 1
+            WEBHOOK_EMBEDS.inc(result='dropped')
+            return False
+        
+        self.pending.append(embed)
+        if len(self.pending) >= MAX_EMBEDS:
+            self._wakeup.set()
+        return True
+    
+    def _next_batch(self):
+        batch = []
+        chars = 0
+        while self.pending and len(batch) < MAX_EMBEDS:
+            size = len(self.pending[0])
+            if batch and chars + size > MAX_EMBED_CHARS:
+                break
+            batch.append(self.pending.popleft())
+            chars += size
+        return batch
+    
+    async def flush(self):
+        while self.pending:
+            batch = self._next_batch()
+            try:
+                with WEBHOOK_SEND_SECONDS.time():
+                    await self._webhook.send(embeds=batch)
+                self.sent += len(batch)
+                WEBHOOK_EMBEDS.inc(len(batch), result='sent')
+            except Exception as e:
+                self.failed += len(batch)
+                WEBHOOK_EMBEDS.inc(len(batch), result='failed')
+                print(f"Error sending {len(batch)} webhook logs: {e}")
+    
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()